@@ -311,5 +311,57 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "lbr",  "three" ],
+[ "lbq",  "three" ],
+[ "lbz",  "three" ],
+[ "lbdf", "three" ],
+[ "lbnq", "three" ],
+[ "lbnz", "three" ],
+[ "lbnf", "three" ],
+]
+
+# Page jump table
+# Instructions that jump to an address in the same page of memory as
+# their operand byte, as mnemonic, addressing mode, number of bits of
+# the address they give, and the number of bytes from the start of the
+# instruction to the address giving the other bits.
+pageJumpTable = [
+[ "br",   "two", 8, 1 ],
+[ "bq",   "two", 8, 1 ],
+[ "bz",   "two", 8, 1 ],
+[ "bdf",  "two", 8, 1 ],
+[ "b1",   "two", 8, 1 ],
+[ "b2",   "two", 8, 1 ],
+[ "b3",   "two", 8, 1 ],
+[ "b4",   "two", 8, 1 ],
+[ "bnq",  "two", 8, 1 ],
+[ "bnz",  "two", 8, 1 ],
+[ "bnf",  "two", 8, 1 ],
+[ "bn1",  "two", 8, 1 ],
+[ "bn2",  "two", 8, 1 ],
+[ "bn3",  "two", 8, 1 ],
+[ "bn4",  "two", 8, 1 ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "lbr", "three" ],
+[ "br",  "two" ],
+]
+
+# Vector table
+# Reset and interrupt entry points, as address and name. The code to
+# run starts at the address itself.
+vectorTable = [
+[ 0x0000, "reset" ],
+]
+vectorFormat = "code"
+
 # End of processor specific code
 ##########################################################################
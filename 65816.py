@@ -329,5 +329,89 @@ opcodeTable = {
 0xff : [ 4, "sbc",  "absolutelongx"           ],
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jmp", "absolute" ],
+[ "jsr", "absolute" ],
+[ "jmp", "absolutelong" ],
+[ "jsr", "absolutelong" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jmp", "absolute" ],
+[ "jmp", "indirect" ],
+[ "jmp", "absoluteindexedindirect" ],
+[ "jmp", "absolutelong" ],
+[ "jmp", "absoluteindirectlong" ],
+[ "bra", "relative" ],
+[ "brl", "relativelong" ],
+[ "rts", "implicit" ],
+[ "rtl", "implicit" ],
+[ "rti", "implicit" ],
+[ "stp", "implicit" ],
+]
+
+# Vector table
+# Reset and interrupt vectors, as address and name. Each holds the
+# address of the code to run, low byte first.
+vectorTable = [
+[ 0xffe4, "cop"       ],
+[ 0xffe6, "brk"       ],
+[ 0xffe8, "abort"     ],
+[ 0xffea, "nmi"       ],
+[ 0xffee, "irq"       ],
+[ 0xfff4, "emu_cop"   ],
+[ 0xfff8, "emu_abort" ],
+[ 0xfffa, "emu_nmi"   ],
+[ 0xfffc, "reset"     ],
+[ 0xfffe, "emu_irq"   ],
+]
+vectorFormat = "little"
+
+# Long relative table
+# Addressing modes of PC relative instructions with a two byte offset,
+# low byte first.
+longRelativeTable = [ "relativelong" ]
+longRelativeFormat = "little"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, or "read" for the address of data, which becomes
+# "write" for the instructions in writeTable. Operands of other modes
+# are left out of cross references.
+referenceTable = {
+"immediate"               : "immediate",
+"zeropage"                : "read",
+"zeropagex"               : "read",
+"zeropagey"               : "read",
+"absolute"                : "read",
+"absolutex"               : "read",
+"absolutey"               : "read",
+"indirect"                : "read",
+"indirectx"               : "read",
+"indirecty"               : "read",
+"indirectzeropage"        : "read",
+"absoluteindexedindirect" : "read",
+"absoluteindirectlong"    : "read",
+"absolutelong"            : "read",
+"absolutelongx"           : "read",
+"directpageindirect"      : "read",
+"directpageindirectlong"  : "read",
+"directpageindirectlongy" : "read",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "sta", "stx", "sty", "asl", "lsr", "rol", "ror", "inc", "dec", "stz", "trb", "tsb" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "jsr" ]
+
 # End of processor specific code
 ##########################################################################
@@ -272,5 +272,63 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jmp", "absolute" ],
+[ "jsr", "absolute" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jmp", "absolute" ],
+[ "jmp", "indirect" ],
+[ "jmp", "absoluteindexedindirect" ],
+[ "bra", "relative" ],
+[ "rts", "implicit" ],
+[ "rti", "implicit" ],
+]
+
+# Vector table
+# Reset and interrupt vectors, as address and name. Each holds the
+# address of the code to run, low byte first.
+vectorTable = [
+[ 0xfffa, "nmi"   ],
+[ 0xfffc, "reset" ],
+[ 0xfffe, "irq"   ],
+]
+vectorFormat = "little"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, or "read" for the address of data, which becomes
+# "write" for the instructions in writeTable. Operands of other modes
+# are left out of cross references.
+referenceTable = {
+"immediate"               : "immediate",
+"zeropage"                : "read",
+"zeropagex"               : "read",
+"zeropagey"               : "read",
+"absolute"                : "read",
+"absolutex"               : "read",
+"absolutey"               : "read",
+"indirect"                : "read",
+"indirectx"               : "read",
+"indirecty"               : "read",
+"indirectzeropage"        : "read",
+"absoluteindexedindirect" : "read",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "sta", "stx", "sty", "asl", "lsr", "rol", "ror", "inc", "dec", "stz", "trb", "tsb", "rmb0", "rmb1", "rmb2", "rmb3", "rmb4", "rmb5", "rmb6", "rmb7", "smb0", "smb1", "smb2", "smb3", "smb4", "smb5", "smb6", "smb7" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "jsr" ]
+
 # End of processor specific code
 ##########################################################################
@@ -274,5 +274,59 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jmp", "extended" ],
+[ "jsr", "extended" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jmp", "extended" ],
+[ "jmp", "indexed" ],
+[ "bra", "relative" ],
+[ "rts", "implied" ],
+[ "rti", "implied" ],
+]
+
+# Vector table
+# Reset and interrupt vectors, as address and name. Each holds the
+# address of the code to run, high byte first.
+vectorTable = [
+[ 0xfff0, "sci"   ],
+[ 0xfff2, "tof"   ],
+[ 0xfff4, "ocf"   ],
+[ 0xfff6, "icf"   ],
+[ 0xfff8, "irq"   ],
+[ 0xfffa, "swi"   ],
+[ 0xfffc, "nmi"   ],
+[ 0xfffe, "reset" ],
+]
+vectorFormat = "big"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, or "read" for the address of data, which becomes
+# "write" for the instructions in writeTable. Operands of other modes
+# are left out of cross references.
+referenceTable = {
+"immediate"  : "immediate",
+"immediatex" : "immediate",
+"direct"     : "read",
+"extended"   : "read",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "staa", "stab", "std", "sts", "stx", "clr", "com", "neg", "inc", "dec", "asl", "asr", "lsr", "rol", "ror" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "jsr", "bsr" ]
+
 # End of processor specific code
 ##########################################################################
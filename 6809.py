@@ -330,5 +330,66 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jmp", "extended" ],
+[ "jsr", "extended" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jmp",  "extended" ],
+[ "jmp",  "direct" ],
+[ "jmp",  "indexed" ],
+[ "bra",  "rel8" ],
+[ "lbra", "rel16" ],
+[ "rts",  "inherent" ],
+[ "rti",  "inherent" ],
+]
+
+# Vector table
+# Reset and interrupt vectors, as address and name. Each holds the
+# address of the code to run, high byte first.
+vectorTable = [
+[ 0xfff2, "swi3"  ],
+[ 0xfff4, "swi2"  ],
+[ 0xfff6, "firq"  ],
+[ 0xfff8, "irq"   ],
+[ 0xfffa, "swi"   ],
+[ 0xfffc, "nmi"   ],
+[ 0xfffe, "reset" ],
+]
+vectorFormat = "big"
+
+# Long relative table
+# Addressing modes of PC relative instructions with a two byte offset,
+# high byte first.
+longRelativeTable = [ "rel16" ]
+longRelativeFormat = "big"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, or "read" for the address of data, which becomes
+# "write" for the instructions in writeTable. Operands of other modes
+# are left out of cross references.
+referenceTable = {
+"imm8"     : "immediate",
+"imm16"    : "immediate",
+"direct"   : "read",
+"extended" : "read",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "sta", "stb", "std", "sts", "stu", "stx", "sty", "clr", "comb", "neg", "inc", "dec", "asr", "lsl", "lsr", "rol", "ror" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "jsr", "bsr", "lbsr" ]
+
 # End of processor specific code
 ##########################################################################
@@ -365,5 +365,74 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jmp", "extended" ],
+[ "jsr", "extended" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jmp", "extended" ],
+[ "jmp", "indexedx" ],
+[ "jmp", "indexedy" ],
+[ "bra", "relative" ],
+[ "rts", "inherent" ],
+[ "rti", "inherent" ],
+]
+
+# Vector table
+# Reset and interrupt vectors, as address and name. Each holds the
+# address of the code to run, high byte first.
+vectorTable = [
+[ 0xffd6, "sci"     ],
+[ 0xffd8, "spi"     ],
+[ 0xffda, "pai"     ],
+[ 0xffdc, "pao"     ],
+[ 0xffde, "tof"     ],
+[ 0xffe0, "toc5"    ],
+[ 0xffe2, "toc4"    ],
+[ 0xffe4, "toc3"    ],
+[ 0xffe6, "toc2"    ],
+[ 0xffe8, "toc1"    ],
+[ 0xffea, "tic3"    ],
+[ 0xffec, "tic2"    ],
+[ 0xffee, "tic1"    ],
+[ 0xfff0, "rti"     ],
+[ 0xfff2, "irq"     ],
+[ 0xfff4, "xirq"    ],
+[ 0xfff6, "swi"     ],
+[ 0xfff8, "illegal" ],
+[ 0xfffa, "cop"     ],
+[ 0xfffc, "cmf"     ],
+[ 0xfffe, "reset"   ],
+]
+vectorFormat = "big"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, or "read" for the address of data, which becomes
+# "write" for the instructions in writeTable. Operands of other modes
+# are left out of cross references.
+referenceTable = {
+"immediate"  : "immediate",
+"immediatex" : "immediate",
+"direct"     : "read",
+"extended"   : "read",
+"direct2"    : "read",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "staa", "stab", "std", "sts", "stx", "sty", "clr", "com", "neg", "inc", "dec", "asr", "lsl", "lsr", "rol", "ror", "bset", "bclr" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "jsr", "bsr" ]
+
 # End of processor specific code
 ##########################################################################
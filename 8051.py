@@ -405,5 +405,106 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "ljmp",  "addr16" ],
+[ "lcall", "addr16" ],
+]
+
+# Page jump table
+# Instructions that jump to or call an address in the same 2K page of
+# memory as the next instruction, as mnemonic, addressing mode, number
+# of bits of the address they give, and the number of bytes from the
+# start of the instruction to the address giving the other bits. The
+# last byte gives the low eight bits and the top bits of the opcode
+# the rest.
+pageJumpTable = [
+[ "ajmp",  "addr11", 11, 2 ],
+[ "acall", "addr11", 11, 2 ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "ljmp", "addr16" ],
+[ "ajmp", "addr11" ],
+[ "sjmp", "offset" ],
+[ "jmp",  "@a+dptr" ],
+[ "ret",  "" ],
+[ "reti", "" ],
+]
+
+# Vector table
+# Reset and interrupt entry points, as address and name. The code to
+# run starts at the address itself.
+vectorTable = [
+[ 0x0000, "reset"  ],
+[ 0x0003, "ie0"    ],
+[ 0x000b, "tf0"    ],
+[ 0x0013, "ie1"    ],
+[ 0x001b, "tf1"    ],
+[ 0x0023, "serial" ],
+[ 0x002b, "tf2"    ],
+]
+vectorFormat = "code"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, "read" for the address of data that is loaded, or
+# "write" where the mode stores to the address, as in "direct,a". A
+# "read" becomes "write" for the instructions in writeTable, which
+# change the data in place. Operands of other modes are left out of
+# cross references.
+referenceTable = {
+"a,immed"       : "immediate",
+"@r0,immed"     : "immediate",
+"@r1,immed"     : "immediate",
+"dptr,immed"    : "immediate",
+"r0,immed"      : "immediate",
+"r1,immed"      : "immediate",
+"r2,immed"      : "immediate",
+"r3,immed"      : "immediate",
+"r4,immed"      : "immediate",
+"r5,immed"      : "immediate",
+"r6,immed"      : "immediate",
+"r7,immed"      : "immediate",
+"direct"        : "read",
+"a,direct"      : "read",
+"@r0,direct"    : "read",
+"@r1,direct"    : "read",
+"r0,direct"     : "read",
+"r1,direct"     : "read",
+"r2,direct"     : "read",
+"r3,direct"     : "read",
+"r4,direct"     : "read",
+"r5,direct"     : "read",
+"r6,direct"     : "read",
+"r7,direct"     : "read",
+"direct,a"      : "write",
+"direct,@r0"    : "write",
+"direct,@r1"    : "write",
+"direct,immed"  : "write",
+"direct,direct" : "write",
+"direct,r0"     : "write",
+"direct,r1"     : "write",
+"direct,r2"     : "write",
+"direct,r3"     : "write",
+"direct,r4"     : "write",
+"direct,r5"     : "write",
+"direct,r6"     : "write",
+"direct,r7"     : "write",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "inc", "dec", "pop", "xch" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "lcall", "acall" ]
+
 # End of processor specific code
 ##########################################################################
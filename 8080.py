@@ -385,5 +385,83 @@ opcodeTable = {
 
 }
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jmp",  "direct" ],
+[ "jnz",  "direct" ],
+[ "jz",   "direct" ],
+[ "jnc",  "direct" ],
+[ "jc",   "direct" ],
+[ "jpo",  "direct" ],
+[ "jpe",  "direct" ],
+[ "jp",   "direct" ],
+[ "jm",   "direct" ],
+[ "call", "direct" ],
+[ "cnz",  "direct" ],
+[ "cz",   "direct" ],
+[ "cnc",  "direct" ],
+[ "cc",   "direct" ],
+[ "cpo",  "direct" ],
+[ "cpe",  "direct" ],
+[ "cp",   "direct" ],
+[ "cm",   "direct" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jmp",  "direct" ],
+[ "pchl", "implied" ],
+[ "ret",  "implied" ],
+]
+
+# Vector table
+# Reset and interrupt entry points, as address and name. The code to
+# run starts at the address itself.
+vectorTable = [
+[ 0x0000, "reset" ],
+[ 0x0008, "rst1"  ],
+[ 0x0010, "rst2"  ],
+[ 0x0018, "rst3"  ],
+[ 0x0020, "rst4"  ],
+[ 0x0028, "rst5"  ],
+[ 0x0030, "rst6"  ],
+[ 0x0038, "rst7"  ],
+]
+vectorFormat = "code"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, or "read" for the address of data, which becomes
+# "write" for the instructions in writeTable. Operands of other modes
+# are left out of cross references.
+referenceTable = {
+"imm"    : "immediate",
+"imma"   : "immediate",
+"immb"   : "immediate",
+"immc"   : "immediate",
+"immd"   : "immediate",
+"imme"   : "immediate",
+"immh"   : "immediate",
+"imml"   : "immediate",
+"immm"   : "immediate",
+"immxb"  : "immediate",
+"immxd"  : "immediate",
+"immxh"  : "immediate",
+"immxsp" : "immediate",
+"direct" : "read",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = [ "sta", "shld" ]
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "call", "cnz", "cz", "cnc", "cc", "cpo", "cpe", "cp", "cm" ]
+
 # End of processor specific code
 ##########################################################################
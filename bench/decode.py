@@ -0,0 +1,37 @@
+#! /usr/bin/env python3
+#
+# Measure decode rate of each CPU plugin.
+#
+# Disassembles a block of random bytes with each CPU and reports bytes
+# per second, both for decoding alone and for producing output lines.
+
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import udis  # noqa: E402
+
+cpus = ["1802", "6502", "65816", "65c02", "6800", "6801", "6809", "6811", "8051", "8080", "8085", "z80"]
+
+size = int(sys.argv[1]) if len(sys.argv) > 1 else 256 * 1024
+
+random.seed(6502)
+data = bytes(random.getrandbits(8) for i in range(size))
+
+print("CPU      decode (KB/s)  lines (KB/s)")
+for cpu in cpus:
+    d = udis.Disassembler(cpu)
+
+    t = time.perf_counter()
+    for insn in d.iter_instructions(data):
+        pass
+    decode = size / (time.perf_counter() - t) / 1024
+
+    t = time.perf_counter()
+    for line in d.lines(data):
+        pass
+    lines = size / (time.perf_counter() - t) / 1024
+
+    print("{0:8s} {1:13.0f}  {2:12.0f}".format(cpu, decode, lines))
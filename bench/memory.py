@@ -0,0 +1,42 @@
+#! /usr/bin/env python3
+#
+# Measure memory used to hold a full disassembly.
+#
+# Disassembles a 4 MB image of random bytes as 65816 code and reports
+# the memory taken by a list of Instruction objects, a list of records
+# (as written by --format) and an InstructionTable.
+
+import os
+import sys
+import gc
+import random
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import udis  # noqa: E402
+
+cpu = sys.argv[2] if len(sys.argv) > 2 else "65816"
+size = int(sys.argv[1]) if len(sys.argv) > 1 else 4 * 1024 * 1024
+
+random.seed(6502)
+data = random.getrandbits(8 * size).to_bytes(size, "little")
+d = udis.Disassembler(cpu)
+
+
+def measure(name, build):
+    gc.collect()
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("{0:20s} {1:10d} {2:10.1f} {3:10.1f} {4:8.1f}".format(name, len(result), used / 1024 / 1024, used / len(result), elapsed))
+
+
+print("{0:s}, {1:d} bytes".format(cpu, size))
+print("{0:20s} {1:>10s} {2:>10s} {3:>10s} {4:>8s}".format("container", "insns", "MB", "bytes/insn", "seconds"))
+measure("Instruction list", lambda: list(d.iter_instructions(data)))
+measure("record list", lambda: [d.record(insn) for insn in d.iter_instructions(data)])
+measure("InstructionTable", lambda: udis.InstructionTable(d, data))
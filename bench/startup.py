@@ -0,0 +1,46 @@
+#! /usr/bin/env python3
+#
+# Measure time to first line of output for each CPU plugin.
+#
+# Runs udis.py as a separate process on a small file, first with an
+# empty plugin cache and then with the cache filled in by that run. The
+# result cache is not used, so that the warm run decodes the file too.
+
+import os
+import sys
+import subprocess
+import tempfile
+import time
+
+udis = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "udis.py")
+
+cpus = ["1802", "6502", "65816", "65c02", "6800", "6801", "6809", "6811", "8051", "8080", "8085", "z80"]
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+
+def first_line(cpu, filename, env):
+    "Return seconds until udis prints its first line"
+    t = time.perf_counter()
+    p = subprocess.Popen([sys.executable, udis, "-c", cpu, "--no-result-cache", filename], stdout=subprocess.PIPE, env=env)
+    p.stdout.readline()
+    elapsed = time.perf_counter() - t
+    p.stdout.close()
+    p.wait()
+    return elapsed
+
+
+with tempfile.TemporaryDirectory() as temp:
+    filename = os.path.join(temp, "input.bin")
+    with open(filename, "wb") as f:
+        f.write(bytes(range(256)))
+
+    print("CPU      cold (ms)  warm (ms)")
+    for cpu in cpus:
+        cold = []
+        warm = []
+        for i in range(runs):
+            env = dict(os.environ, XDG_CACHE_HOME=os.path.join(temp, "cache{0:d}".format(i)))
+            cold.append(first_line(cpu, filename, env))
+            warm.append(first_line(cpu, filename, env))
+        print("{0:8s} {1:9.1f}  {2:9.1f}".format(cpu, min(cold) * 1000, min(warm) * 1000))
@@ -0,0 +1,2916 @@
+#
+# Universal Disassembler
+# Copyright (c) 2013-2020 by Jeff Tranter <tranter@pobox.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# This module holds all of the disassembler. udis.py runs it from the
+# command line, and can also be imported to use it from Python.
+
+import os
+import sys
+import argparse
+import array
+import bisect
+import collections
+import glob
+import itertools
+import marshal
+import math
+import mmap
+import re
+import shlex
+import signal
+import string
+import time
+import types
+import zlib
+
+__version__ = "1.1"
+
+# Flags
+
+
+pcr = 1
+und = 2
+z80bit = 4
+inv = 8  # Invalid opcode. Set by the disassembler, not used in plugins.
+jump = 16  # Jumps to or calls its operand. Set by the disassembler from jumpTable.
+stop = 32  # Execution does not go on to the next instruction. Set from stopTable.
+longpcr = 64  # PC relative offset is two bytes. Set from longRelativeTable.
+page = 128  # Jumps to or calls an address in the same page. Set from pageJumpTable.
+
+# CPUs supported by the plugins in this directory.
+cpus = "1802 6502 65816 65c02 6800 6801/6803 6809 6811 8051 8080 8085 z80"
+
+# Directory containing this program and the CPU plugins, and the names
+# of the files of the program, which are not plugins.
+pluginDir = os.path.dirname(os.path.realpath(__file__))
+programFiles = ("udis", "udislib")
+
+# Directory for cached plugin tables.
+cacheDir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "udis")
+
+# Names defined by a plugin that are used by the disassembler.
+pluginTables = ("maxLength", "leadInBytes", "opcodeTable", "addressModeTable")
+
+# Names a plugin may define, and the values used if it does not.
+pluginOptional = {"jumpTable": [], "stopTable": [], "vectorTable": [], "vectorFormat": "code",
+                  "referenceTable": {}, "writeTable": [], "callTable": [],
+                  "longRelativeTable": [], "longRelativeFormat": "little", "pageJumpTable": []}
+
+# Ways a vector may give the address of the code to run: read from the
+# vector low or high byte first, or the vector is the code itself.
+vectorFormats = ("little", "big", "code")
+
+# Byte orders of a two byte PC relative offset (see longRelativeTable).
+longRelativeFormats = ("little", "big")
+
+# Output formats. Formats other than text write a record for each
+# instruction, with these fields.
+outputFormats = ("text", "jsonl", "csv", "tsv")
+recordFields = ("cpu", "address", "bytes", "length", "mnemonic", "operand", "value", "target", "flags")
+
+# Kinds of reference an instruction can make to an address or value,
+# in cross reference databases.
+referenceKinds = ("branch", "call", "jump", "read", "write", "immediate")
+
+# Names of flags in records.
+flagNames = ((pcr, "pcr"), (und, "und"), (inv, "inv"))
+
+s = "                          "
+
+# Number of bytes at the start of the input scored by --cpu auto, and
+# how sharply confidence favours the best score (see rank_cpus). Runs
+# of at least autoFill copies of one byte, such as the $FF of unused
+# EPROM, are left out of the sample. Bytes that are not code score
+# about autoFloor for a CPU that can decode any byte, so confidence is
+# scaled by how far the best score is above it.
+autoSample = 16 * 1024
+autoSharpness = 25
+autoFill = 16
+autoFloor = 2 / 3
+
+# Hash of the source of udis, set by source_hash.
+sourceHash = None
+
+# Hex strings for byte and word values, used to format operands and
+# listings without parsing a format string for every instruction. The
+# word strings are made as they are first used, as making all 65536 of
+# them would slow down starting up.
+class HexWords(dict):
+    "Hex strings for word values, indexed by value"
+
+    def __missing__(self, value):
+        text = self[value] = "{0:04X}".format(value)
+        return text
+
+
+hexbyte = ["{0:02X}".format(i) for i in range(256)]
+hexword = HexWords()
+
+# Functions
+
+
+def isprint(char):
+    "Return if character is printable ASCII"
+    return '@' <= char <= '~'
+
+
+def auto_int(x):
+    return int(x, 0)
+
+
+def import_numpy():
+    """Return the numpy module, or None if it is not installed.
+
+    NumPy is optional, and only imported when first needed so that it
+    does not slow down starting up.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def source_hash():
+    """Return a hash of the source of udis itself.
+
+    The tables and code generated from a plugin are cached under this,
+    so that they are made again whenever udis changes how they are
+    generated. The hash is only worked out once.
+    """
+    global sourceHash
+    if sourceHash is None:
+        with open(os.path.realpath(__file__), "rb") as f:
+            sourceHash = zlib.crc32(f.read())
+    return sourceHash
+
+
+def plugin_path(cpu):
+    "Return the file name of the plugin for a CPU"
+    return pluginDir + os.sep + cpu + ".py"
+
+
+def run_plugin(cpu):
+    "Run a CPU plugin and return a dictionary of the tables it defines"
+    namespace = {"pcr": pcr, "und": und, "z80bit": z80bit}
+    with open(plugin_path(cpu)) as f:
+        exec(f.read(), namespace)
+    plugin = {name: namespace[name] for name in pluginTables}
+    for name, value in pluginOptional.items():
+        plugin[name] = namespace.get(name, value)
+    return plugin
+
+
+def load_plugin(cpu, cache=True):
+    """Return a dictionary of the tables defined by a CPU plugin.
+
+    The dictionary also holds a "renderers" dictionary of compiled
+    operand formats (see compile_format). Running a plugin and compiling
+    its formats takes a noticeable time for large plugins like z80.py,
+    so the results are saved in cacheDir and reused for as long as the
+    plugin file and udis itself are unchanged (see source_hash).
+    """
+    path = plugin_path(cpu)
+    info = os.stat(path)
+    key = (__version__, source_hash(), path, info.st_mtime_ns, info.st_size)
+    cacheFile = os.path.join(cacheDir, "{0:s}-{1:08x}.cache".format(os.path.basename(cpu), zlib.crc32(path.encode())))
+
+    plugin = None
+    if cache:
+        try:
+            with open(cacheFile, "rb") as f:
+                saved = marshal.loads(f.read())
+            if saved[0] == key:
+                plugin = saved[1]
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            pass
+
+    # Tables saved by an older version may not have all the optional
+    # names, which the plugin can't define if it hasn't changed since.
+    if plugin is not None:
+        for name, value in pluginOptional.items():
+            plugin.setdefault(name, value)
+
+    if plugin is None:
+        plugin = run_plugin(cpu)
+        plugin["renderers"] = compile_renderers(plugin)
+        if cache:
+            save_cache(cacheFile, (key, plugin))
+
+    # The renderers are saved as a code object that builds them.
+    namespace = {"hexbyte": hexbyte, "hexword": hexword}
+    exec(plugin["renderers"], namespace)
+    plugin["renderers"] = namespace["renderers"]
+    return plugin
+
+
+def save_cache(cacheFile, value):
+    "Write a value to a cache file, ignoring any errors"
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        temp = "{0:s}.{1:d}".format(cacheFile, os.getpid())
+        with open(temp, "wb") as f:
+            f.write(marshal.dumps(value))
+        os.replace(temp, cacheFile)
+    except OSError:
+        pass
+
+
+def format_source(format, pcrField=None, fields=None):
+    """Return Python source for an expression that formats operands.
+
+    The expression uses the operand bytes op, where op[1] is the first
+    operand, and gives the same string as format.format(op[1], ...).
+    Two and four digit upper case hex fields are looked up in tables.
+    pcrField is the number of the field holding a PC relative address,
+    which can be outside the range of the tables. If fields is given,
+    fields[i] is the source to use instead of op[i].
+    """
+    parts = []
+    auto = 0
+    for literal, field, spec, conversion in string.Formatter().parse(format):
+        if literal:
+            parts.append(repr(literal))
+        if field is None:
+            continue
+        if field == "":
+            field = auto
+            auto += 1
+        field = int(field)
+        value = fields[field + 1] if fields else "op[{0:d}]".format(field + 1)
+        if conversion:
+            value = "{0!r}.format({1:s})".format("{!" + conversion + ":" + spec + "}", value)
+        elif spec == "02X" and field != pcrField:
+            value = "hexbyte[{0:s}]".format(value)
+        elif spec == "04X" and field != pcrField:
+            value = "hexword[{0:s}]".format(value)
+        elif spec == "04X":
+            value = "(hexword[{0:s}] if {0:s} < 65536 else format({0:s}, '04X'))".format(value)
+        else:
+            value = "format({0:s}, {1!r})".format(value, spec)
+        parts.append(value)
+    if not parts:
+        parts.append("''")
+    return " + ".join(parts)
+
+
+def compile_format(format, pcrField=None):
+    "Compile an operand format string into a function of the operand bytes"
+    return eval("lambda op: " + format_source(format, pcrField), {"hexbyte": hexbyte, "hexword": hexword})
+
+
+def value_source(format):
+    """Return Python source for an expression giving the value of an operand.
+
+    The value is that of the first number in the operand, made up of
+    the fields that follow each other in format with nothing between
+    them, first field most significant. The expression uses the operand
+    bytes op like format_source, and is None if format has no fields.
+    """
+    parts = []
+    auto = 0
+    for literal, field, spec, conversion in string.Formatter().parse(format):
+        if literal and parts:
+            break
+        if field is None:
+            continue
+        if field == "":
+            field = auto
+            auto += 1
+        value = "op[{0:d}]".format(int(field) + 1)
+        if spec == "02X" and not conversion:
+            parts.append((value, 8))
+        elif spec == "04X" and not conversion:
+            parts.append((value, 16))
+        else:
+            parts.append((value, 0))
+            break
+    if not parts:
+        return "None"
+    source = parts[0][0]
+    for value, bits in parts[1:]:
+        source = "({0:s} << {1:d} | {2:s})".format(source, bits, value)
+    return source
+
+
+def compile_value(format):
+    "Compile an operand format string into a function of the operand bytes giving its value"
+    return eval("lambda op: " + value_source(format))
+
+
+def compile_renderers(plugin):
+    """Compile all operand formats of a plugin.
+
+    Returns a code object which sets renderers to a dictionary mapping
+    (format, pcrField) to a function, as given by compile_format. A PC
+    relative operand is the last one, whose field number depends on
+    whether the instruction has a leadin byte and on the --nolist option,
+    so both possibilities are included.
+    """
+    modes = plugin["addressModeTable"]
+    keys = set()
+    for entry in plugin["opcodeTable"].values():
+        format = modes.get(entry[2], "")
+        keys.add((format, None))
+        if len(entry) > 3 and entry[3] & pcr:
+            keys.add((format, entry[0] - 2))
+            keys.add((format, entry[0] - 3))
+    source = "renderers = {\n"
+    for key in sorted(keys, key=repr):
+        source += "    {0!r}: lambda op: {1:s},\n".format(key, format_source(*key))
+    source += "}\n"
+    return compile(source, "<renderers>", "exec")
+
+
+class Prefix(list):
+    """A node of a trie of instruction prefixes.
+
+    Holds 256 entries, selected by the byte at index offset of an
+    instruction. An entry is either another Prefix or a slot for a
+    complete instruction with prefix opcode bytes. If build is given,
+    the entries are only made when load is first called.
+    """
+
+    def __init__(self, offset, prefix, entries=(), build=None):
+        list.__init__(self, entries)
+        self.offset = offset
+        self.prefix = prefix
+        self.build = build
+
+    def load(self):
+        "Make the entries if not done already, and return the node"
+        if self.build is not None:
+            self[:] = self.build()
+            self.build = None
+        return self
+
+
+def compile_tables(plugin, undocumented=False, invalid_as_bytes=True, nolist=False):
+    """Compile the opcode table of a plugin into a dispatch table.
+
+    Returns a Prefix trie whose root holds 256 slots indexed by the
+    first byte of an instruction. The slot for a leadin byte is itself
+    a Prefix of slots indexed by the second byte. For a z80bit
+    placeholder the real instruction is given by the fourth byte, after
+    the offset, so its slot is a Prefix indexed by that byte, which is
+    only built when needed. Each slot is a tuple of:
+      count - number of operand bytes after the opcode
+      length - amount to advance address to next instruction
+      mnemonic - mnemonic, or .byte directive for an invalid opcode
+      operand - operand if it does not depend on operand bytes, else None
+      render - function to format the operand bytes (see compile_format)
+      flags - flags from opcode table, plus inv if opcode is invalid, and
+              jump, stop and page if it is in the jump, stop or page
+              jump table, and longpcr if its mode is in the
+              longRelativeTable
+    """
+    maxLength = plugin["maxLength"]
+    table = plugin["opcodeTable"]
+    modes = plugin["addressModeTable"]
+    renderers = plugin.get("renderers", {})
+    jumps = set(tuple(entry) for entry in plugin.get("jumpTable", []))
+    stops = set(tuple(entry) for entry in plugin.get("stopTable", []))
+    longModes = set(plugin.get("longRelativeTable", []))
+    pageJumps = set((mnemonic, mode) for mnemonic, mode, bits, base in plugin.get("pageJumpTable", []))
+
+    def renderer(format, pcrField=None):
+        render = renderers.get((format, pcrField))
+        if render is None:
+            render = renderers[(format, pcrField)] = compile_format(format, pcrField)
+        return render
+
+    for entry in table.values():
+        if entry[2] not in modes:
+            raise ValueError("mode '{}' not found in addressModeTable.".format(entry[2]))
+
+    def compile_slot(opcode, leadin):
+        entry = table.get(opcode)
+        if entry is not None:
+            length, mnemonic, mode = entry[0:3]
+            if len(entry) > 3:
+                flags = entry[3]  # Get optional flags
+            else:
+                flags = 0
+            if (mnemonic, mode) in jumps:
+                flags |= jump
+            if (mnemonic, mode) in stops:
+                flags |= stop
+            if flags & pcr and mode in longModes:
+                flags |= longpcr
+            if (mnemonic, mode) in pageJumps:
+                flags |= page
+            format = modes[mode]
+        else:
+            length = 1  # Invalid opcode
+            format = ""
+            mnemonic = "???"
+            flags = inv
+
+        if flags & und and not undocumented:
+            # currently only handles one-byte undocumented opcodes
+            length = 1
+            format = ""
+            mnemonic = "???"
+            flags |= inv
+
+        # When listing, the leadin byte counts towards the instruction length.
+        if leadin and not nolist:
+            length -= 1
+
+        # Invalid op code is displayed as ??? or .byte depending on option.
+        if flags & inv and invalid_as_bytes:
+            if leadin:
+                mnemonic = ".byte  ${0:02X},${1:02X}".format(opcode // 256, opcode % 256)
+            elif isprint(chr(opcode)):
+                mnemonic = ".byte  '{0:c}'".format(opcode)
+            else:
+                mnemonic = ".byte  ${0:02X}".format(opcode)
+
+        count = min(length, maxLength) - 1
+        if length == 3 and flags & z80bit:
+            # Table of the real instructions, selected by the last byte.
+            return Prefix(3, 2, build=lambda: [compile_z80bit(count, (opcode << 16) + i) for i in range(256)])
+        elif length == 1:
+            return (count, length, mnemonic, format, None, flags)
+        elif length > 1:
+            if flags & pcr:
+                render = renderer(format, length - 2)
+            else:
+                render = renderer(format)
+            return (count, length, mnemonic, None, render, flags)
+        else:
+            return (count, length, mnemonic, "", None, flags)
+
+    def compile_z80bit(count, opcode):
+        length, mnemonic, mode, flags = table[opcode]
+        return (count, length, mnemonic, None, renderer(modes[mode]), flags)
+
+    dispatch = Prefix(0, 1, [compile_slot(opcode, False) for opcode in range(256)])
+    for leadin in plugin["leadInBytes"]:
+        dispatch[leadin] = Prefix(1, 2, [compile_slot((leadin << 8) + opcode, True) for opcode in range(256)])
+    return dispatch
+
+
+def compile_references(plugin):
+    """Return the kind of reference made by the operand of each opcode of a plugin.
+
+    Returns a dictionary mapping an opcode, as in the opcodeTable, to
+    one of referenceKinds. Branches and jumps are calls if they are in
+    the callTable, and so are instructions that read from an address
+    if they are in the callTable, jumps if they jump elsewhere, and
+    writes if they are in the writeTable. A mode may also be given as
+    "write" in the referenceTable, for CPUs whose modes show which way
+    the data goes. Opcodes whose operand is not a reference (see
+    referenceTable) are left out.
+    """
+    jumps = set(tuple(entry) for entry in plugin["jumpTable"])
+    jumpMnemonics = set(mnemonic for mnemonic, mode in jumps)
+    calls = set(plugin["callTable"])
+    writes = set(plugin["writeTable"])
+    modes = plugin["referenceTable"]
+    kinds = {}
+
+    for opcode, entry in plugin["opcodeTable"].items():
+        mnemonic, mode = entry[1:3]
+        flags = entry[3] if len(entry) > 3 else 0
+        if flags & pcr or (mnemonic, mode) in jumps:
+            kind = "call" if mnemonic in calls else "branch" if flags & pcr else "jump"
+        else:
+            kind = modes.get(mode)
+            if kind == "read" and mnemonic in calls:
+                kind = "call"
+            elif kind == "read" and mnemonic in jumpMnemonics:
+                kind = "jump"
+            elif kind == "read" and mnemonic in writes:
+                kind = "write"
+        if kind is not None:
+            kinds[opcode] = kind
+
+    return kinds
+
+
+def compile_lengths(dispatch):
+    """Return a table giving only the size of each instruction.
+
+    The table is a trie with the same layout as one from compile_tables,
+    but each slot is a tuple of the number of bytes in the instruction,
+    the amount to advance the address and the flags.
+    """
+    def sizes(node):
+        entries = []
+        for slot in node.load():
+            if slot.__class__ is Prefix:
+                entries.append(lengths(slot))
+            else:
+                entries.append((node.prefix + max(slot[0], 0), slot[1], slot[5]))
+        return entries
+
+    def lengths(node):
+        if node.build is not None:
+            return Prefix(node.offset, node.prefix, build=lambda: sizes(node))
+        return Prefix(node.offset, node.prefix, sizes(node))
+
+    return lengths(dispatch)
+
+
+# Matches a byte of a bitset with any bit set.
+nonZero = re.compile(b"[^\\x00]")
+
+# Matches a run of one byte repeated to fill unused space (see autoFill).
+fillRun = re.compile(b"(.)\\1{%d,}" % (autoFill - 1), re.DOTALL)
+
+# The NumPy scan looks up scanBlock indexes at a time, to limit the
+# memory used for temporary arrays.
+scanBlock = 1024 * 1024
+
+
+def scan_tables(numpy, node):
+    """Return NumPy lookup tables for a node of a trie from compile_lengths.
+
+    Gives arrays of the number of bytes, amount to advance the address
+    and flags of the slot selected by each byte value (0 for a Prefix),
+    and a list of the byte values that select a Prefix.
+    """
+    count, advance, flags = (numpy.zeros(256, numpy.uint8) for i in range(3))
+    prefixes = []
+    for byte, slot in enumerate(node.load()):
+        if slot.__class__ is Prefix:
+            prefixes.append(byte)
+        else:
+            count[byte], advance[byte], flags[byte] = slot
+    return count, advance, flags, prefixes
+
+
+def scan_numpy(numpy, lengths, buffer, start, size):
+    """Look up the instruction at every index of buffer from start to size.
+
+    Gives the same result as Disassembler.scan, but looks up all the
+    indexes that reach the same node of the trie of lengths at once.
+    """
+    if start >= size:
+        return b"", b"", b""
+    data = numpy.frombuffer(buffer, numpy.uint8, size)
+    columns = [numpy.zeros(size - start, numpy.uint8) for i in range(3)]
+    tables = {}
+
+    for block in range(start, size, scanBlock):
+        work = [(lengths, numpy.arange(block, min(block + scanBlock, size)))]
+        while work:
+            node, positions = work.pop()
+            if id(node) not in tables:
+                tables[id(node)] = scan_tables(numpy, node)
+            count, advance, flags, prefixes = tables[id(node)]
+
+            # Leave out instructions cut short by size.
+            positions = positions[positions + node.offset < size]
+            keys = data[positions + node.offset]
+            found = positions + count[keys] <= size
+            index = positions[found] - start
+            for column, table in zip(columns, (count, advance, flags)):
+                column[index] = table[keys[found]]
+
+            for byte in prefixes:
+                work.append((node[byte], positions[keys == byte]))
+
+    # Release the view, so that an mmap buffer can be closed.
+    del data
+    return tuple(column.tobytes() for column in columns)
+
+
+def next_bit(bits, i, limit):
+    "Return the index of the first bit set in a bitset at or after i, or limit if none is before it"
+    while i < limit and i & 7:
+        if bits[i >> 3] >> (i & 7) & 1:
+            return i
+        i += 1
+    if i >= limit:
+        return limit
+    match = nonZero.search(bits, i >> 3)
+    if match is None:
+        return limit
+    i = match.start() << 3
+    byte = bits[i >> 3]
+    return min(i + (byte & -byte).bit_length() - 1, limit)
+
+
+def decoder_source(dispatch, renderers):
+    """Return the source of a module that decodes instructions.
+
+    The module is generated from a dispatch table from compile_tables,
+    whose render functions are found in renderers. It has a function
+    for each prefix, which selects a function from a table by the next
+    byte to look at, and one for each opcode, which decodes one
+    instruction with the mnemonic, length and flags as constants and
+    the operand formatted straight from the bytes in buffer. Its decode
+    function is used by Disassembler.iter_instructions.
+    """
+    formats = {render: key for key, render in renderers.items()}
+    lines = []
+    defined = {}
+
+    def define(name, body):
+        "Add a function, unless the same one was added before. Returns its name"
+        text = "\n".join(body)
+        if text not in defined:
+            defined[text] = name
+            lines.append("def {0:s}(buffer, pos, size, address):".format(name))
+            lines.extend("    " + line for line in body)
+            lines.append("")
+        return defined[text]
+
+    def table(name, entries):
+        "Add a list of functions"
+        lines.append("{0:s} = [{1:s}]".format(name, ", ".join(entries)))
+        lines.append("")
+
+    def instruction(prefix, slot, name):
+        "Add a function for the instruction described by a slot from a dispatch table"
+        count, length, mnemonic, operand, render, flags = slot
+        if count <= 0:
+            return define(name, ["return Instruction(address, buffer[pos:pos + {0:d}], {1!r}, {2!r}, {3!r}, {4!r}, None)".format(prefix, length, mnemonic, operand, flags)])
+
+        # Operands are numbered from the last opcode byte, so that op[1]
+        # is the first operand and op[i] is buffer[pos + prefix - 1 + i].
+        end = prefix + count
+        fields = ["buffer[pos + {0:d}]".format(prefix - 1 + i) for i in range(count + 1)]
+        check = ["if pos + {0:d} > size:".format(end), "    return None"]
+        body = []
+        target = "None"
+        if flags & pcr:
+            # Handle relative addresses. Assumes the operand that needs
+            # to be PC relative is the last one.
+            body = ["target = " + fields[length - 1],
+                    "target = address + target + ({0:d} if target < 128 else {1:d})".format(length, length - 256),
+                    "if target < 0:",
+                    "    target += 65536"]
+            fields[length - 1] = target = "target"
+
+        body.append("return Instruction(address, buffer[pos:pos + {0:d}], {1!r}, {2!r}, {3:s}, {4!r}, {5:s})".format(end, length, mnemonic, format_source(*formats[render], fields), flags, target))
+        return define(name, check + body)
+
+    def entries(node, name):
+        "Add functions for the entries of a Prefix. Returns their names"
+        names = []
+        for i, slot in enumerate(node.load()):
+            sub = "{0:s}{1:02X}".format(name, i)
+            if slot.__class__ is Prefix:
+                # The next byte to look at selects a function from another table.
+                table(sub + "_table", entries(slot, sub))
+                names.append(define(sub, ["if pos + {0:d} >= size:".format(slot.offset),
+                                          "    return None",
+                                          "return {0:s}_table[buffer[pos + {1:d}]](buffer, pos, size, address)".format(sub, slot.offset)]))
+            elif node is dispatch and slot[0] <= 0:
+                # One byte instructions are built in decode, saving a call.
+                names.append(repr(slot[1:4] + slot[5:]))
+            else:
+                names.append(instruction(node.prefix, slot, sub))
+        return names
+
+    table("handlers", entries(dispatch, "op_"))
+
+    lines.append("def decode(buffer, pos, size, address, handlers=handlers, Instruction=Instruction, tuple=tuple):")
+    lines.append("    while pos < size:")
+    lines.append("        handler = handlers[buffer[pos]]")
+    lines.append("        if handler.__class__ is tuple:")
+    lines.append("            length, mnemonic, operand, flags = handler")
+    lines.append("            yield Instruction(address, buffer[pos:pos + 1], length, mnemonic, operand, flags, None)")
+    lines.append("            pos += 1")
+    lines.append("            address = (address + length) & 0xffff")
+    lines.append("        else:")
+    lines.append("            insn = handler(buffer, pos, size, address)")
+    lines.append("            if insn is None:  # Unexpected EOF")
+    lines.append("                return")
+    lines.append("            yield insn")
+    lines.append("            pos += len(insn.data)")
+    lines.append("            address = (address + insn.length) & 0xffff")
+    return "\n".join(lines) + "\n"
+
+
+def load_decoder(cpu, dispatch, renderers, options, cache=True):
+    """Return the decode function of the module from decoder_source.
+
+    options are the options dispatch was compiled with. Generating and
+    compiling the module takes a noticeable time, so the code is saved
+    in cacheDir like the plugin tables, for each set of options.
+    """
+    path = plugin_path(cpu)
+    info = os.stat(path)
+    key = (__version__, source_hash(), path, info.st_mtime_ns, info.st_size, options)
+    cacheFile = os.path.join(cacheDir, "{0:s}-{1:08x}-{2:s}.decoder".format(os.path.basename(cpu), zlib.crc32(path.encode()), "".join(str(int(option)) for option in options)))
+
+    code = None
+    if cache:
+        try:
+            with open(cacheFile, "rb") as f:
+                saved = marshal.loads(f.read())
+            if saved[0] == key:
+                code = saved[1]
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            pass
+
+    if code is None:
+        code = compile(decoder_source(dispatch, renderers), "<{0:s} decoder>".format(cpu), "exec")
+        if cache:
+            save_cache(cacheFile, (key, code))
+
+    namespace = {"Instruction": Instruction, "hexbyte": hexbyte, "hexword": hexword}
+    exec(code, namespace)
+    return namespace["decode"]
+
+
+class Instruction:
+    "A single disassembled instruction"
+
+    # Fields:
+    # address - address of instruction
+    # data - instruction bytes
+    # length - amount to advance address to next instruction
+    # mnemonic - assembler mnemonic
+    # operand - formatted operand (may be empty)
+    # flags - flags from opcode table, plus inv if opcode is invalid, and
+    #         jump and stop if it is in the jump or stop table
+    # target - resolved address for PC relative instructions, otherwise None
+
+    __slots__ = ("address", "data", "length", "mnemonic", "operand", "flags", "target")
+
+    def __init__(self, address, data, length, mnemonic, operand, flags, target):
+        self.address = address
+        self.data = data
+        self.length = length
+        self.mnemonic = mnemonic
+        self.operand = operand
+        self.flags = flags
+        self.target = target
+
+    def __repr__(self):
+        return "Instruction({0:04X}, {1!r}, {2!r})".format(self.address, self.mnemonic, self.operand)
+
+
+class Disassembler:
+    "Disassembler for one CPU, using tables loaded from its plugin"
+
+    def __init__(self, cpu, origin=0, undocumented=False, invalid_as_bytes=True, nolist=False, cache=True, render_cache=4096):
+        plugin = load_plugin(cpu, cache)
+        self.cpu = cpu
+        self.maxLength = plugin["maxLength"]
+        self.leadInBytes = frozenset(plugin["leadInBytes"])
+        self.opcodeTable = plugin["opcodeTable"]
+        self.addressModeTable = plugin["addressModeTable"]
+        self.renderers = plugin["renderers"]
+        self.vectorTable = [tuple(entry) for entry in plugin["vectorTable"]]
+        self.vectorFormat = plugin["vectorFormat"]
+        if self.vectorFormat not in vectorFormats:
+            raise ValueError("unknown vectorFormat '{0:s}' in plugin for {1:s}".format(self.vectorFormat, cpu))
+        self.longRelativeFormat = plugin["longRelativeFormat"]
+        if self.longRelativeFormat not in longRelativeFormats:
+            raise ValueError("unknown longRelativeFormat '{0:s}' in plugin for {1:s}".format(self.longRelativeFormat, cpu))
+        pageJumps = {(mnemonic, mode): (bits, base) for mnemonic, mode, bits, base in plugin["pageJumpTable"]}
+        self.pageJumps = {opcode: pageJumps[tuple(entry[1:3])] for opcode, entry in self.opcodeTable.items() if tuple(entry[1:3]) in pageJumps}
+        self.values = {}
+
+        # Silently force starting address to be in valid range.
+        self.origin = origin & 0xffff
+        self.undocumented = undocumented
+        self.invalid_as_bytes = invalid_as_bytes
+        self.nolist = nolist
+
+        self.dispatch = compile_tables(plugin, undocumented, invalid_as_bytes, nolist)
+        self.references = compile_references(plugin)
+        self.lengths = compile_lengths(self.dispatch)
+        self.decode = load_decoder(cpu, self.dispatch, plugin["renderers"], (undocumented, invalid_as_bytes, nolist), cache)
+
+        # Padding after the instruction bytes of a non-leadin instruction,
+        # indexed by instruction length. Keeps the mnemonics lined up.
+        self.padding = ["   " * (self.maxLength - max(i, 1)) for i in range(self.maxLength + 1)]
+
+        # Numbers of hits and misses of the render cache. There is no
+        # cache if render_cache is 0.
+        self.cacheCounts = [0, 0]
+        if render_cache > 0:
+            self.format_line = self.cached_format_line(render_cache)
+
+    def iter_instructions(self, buffer, origin=None, start=0, end=None):
+        """Generate an Instruction for each instruction in buffer.
+
+        Decoding starts at index start of buffer, at address origin, and
+        stops at index end. An instruction cut short by end is not
+        generated.
+        """
+        size = len(buffer) if end is None else end
+        address = self.origin if origin is None else origin & 0xffff
+        return self.decode(buffer, start, size, address)
+
+    def iter_stream(self, blocks, origin=None):
+        """Generate an Instruction for each instruction in a stream of blocks of bytes.
+
+        Gives the same instructions as iter_instructions would for all
+        the blocks joined together, but only holds one block at a time,
+        plus the bytes at the end of the previous block that may be the
+        start of an instruction that goes on into the next one.
+        """
+        address = self.origin if origin is None else origin & 0xffff
+        tail = b""
+
+        for block in blocks:
+            buffer = tail + block
+
+            # An instruction that starts before limit can't be cut short
+            # by the end of the buffer. Leave the rest for the next block.
+            limit = len(buffer) - self.maxLength - 1
+            pos = 0
+            if limit > 0:
+                for insn in self.iter_instructions(buffer, address):
+                    yield insn
+                    pos += len(insn.data)
+                    address = (insn.address + insn.length) & 0xffff
+                    if pos >= limit:
+                        break
+            tail = buffer[pos:]
+
+        yield from self.iter_instructions(tail, address)
+
+    def scan(self, buffer, start=0, end=None, vectorize=True):
+        """Find the instruction that would start at every index of buffer.
+
+        Returns three bytes objects with an item for each index from
+        start up to end: the number of bytes in the instruction starting
+        there (0 if it is cut short by end), the amount it advances the
+        address and its flags, such as und and inv. If NumPy is
+        installed and vectorize is true, all the indexes are looked up
+        together, otherwise one at a time, with the same result.
+        """
+        size = len(buffer) if end is None else end
+        numpy = import_numpy() if vectorize else None
+        if numpy is not None:
+            return scan_numpy(numpy, self.lengths, buffer, start, size)
+
+        lengths = self.lengths
+        counts = bytearray(max(size - start, 0))
+        advances = bytearray(len(counts))
+        flags = bytearray(len(counts))
+
+        for pos in range(start, size):
+            entry = lengths[buffer[pos]]
+            while entry.__class__ is Prefix and pos + entry.offset < size:
+                entry = (entry or entry.load())[buffer[pos + entry.offset]]
+            if entry.__class__ is Prefix or pos + entry[0] > size:
+                continue
+            i = pos - start
+            counts[i], advances[i], flags[i] = entry
+
+        return bytes(counts), bytes(advances), bytes(flags)
+
+    def boundaries(self, buffer, start=0, end=None, stop=None):
+        """Find where each instruction in buffer starts, without decoding it fully.
+
+        Returns an array of the index in buffer of each instruction
+        from start, and an array of their addresses relative to that of
+        the first. Stops at index end, or after the first instruction
+        at or after index stop. Gives the same instructions as
+        iter_instructions.
+        """
+        lengths = self.lengths
+        starts = array.array("I")
+        addresses = array.array("H")
+        pos = start
+        size = len(buffer) if end is None else end
+        if stop is None:
+            stop = size
+        address = 0
+
+        if import_numpy() is not None:
+            # Look up the instruction at every index with NumPy, then
+            # follow the chain from start. None of the instructions
+            # followed go past window.
+            window = min(size, stop + 2 * self.maxLength + 2)
+            counts, advances, flags = self.scan(buffer, start, window)
+            append = starts.append
+            i = 0
+            last = stop - start
+            while i < len(counts):
+                count = counts[i]
+                if not count:  # Unexpected EOF
+                    break
+                append(start + i)
+                addresses.append(address)
+                if i >= last:
+                    break
+                address = (address + advances[i]) & 0xffff
+                i += count
+            return starts, addresses
+
+        while pos < size:
+            # Walk down the trie of prefixes to the slot for the
+            # instruction. An empty Prefix has yet to be built.
+            entry = lengths[buffer[pos]]
+            while entry.__class__ is Prefix and pos + entry.offset < size:
+                entry = (entry or entry.load())[buffer[pos + entry.offset]]
+            if entry.__class__ is Prefix:  # Unexpected EOF
+                break
+            count, length, flags = entry
+            if pos + count > size:  # Unexpected EOF
+                break
+            starts.append(pos)
+            addresses.append(address)
+            if pos >= stop:
+                break
+            pos += count
+            address = (address + length) & 0xffff
+
+        return starts, addresses
+
+    def trace(self, buffer, entries, origin=None, start=0, end=None):
+        """Find the instructions reached by following the code from entry points.
+
+        Decodes from the address of each entry point, following PC
+        relative branches, jumps and calls within a page (see
+        pageJumpTable) and jumps and calls to an absolute address, until
+        it comes to an instruction already found, one after which
+        execution does not go on (see stopTable), an invalid opcode or
+        the end of the window from start to end of buffer. The window
+        starts at address origin, and the target of a jump is taken to
+        be in the same 64K of the window as the jump, unless it is given
+        as an address of more than 16 bits. An instruction that would
+        overlap one already found is left out.
+
+        Returns a bitset with a bit for each byte of the window, set for
+        the first byte of each instruction found.
+        """
+        size = len(buffer) if end is None else end
+        origin = self.origin if origin is None else origin & 0xffff
+        length = size - start
+        lengths = self.lengths
+        starts = bytearray((length + 7) >> 3)
+        code = bytearray((length + 7) >> 3)  # Bytes used by an instruction
+        work = [(entry - origin) & 0xffff for entry in entries]
+
+        while work:
+            i = work.pop()
+            while 0 <= i < length and not starts[i >> 3] >> (i & 7) & 1:
+                pos = start + i
+                entry = lengths[buffer[pos]]
+                while entry.__class__ is Prefix and pos + entry.offset < size:
+                    entry = (entry or entry.load())[buffer[pos + entry.offset]]
+                if entry.__class__ is Prefix:  # Unexpected EOF
+                    break
+                count, advance, flags = entry
+                if pos + count > size or flags & inv:
+                    break
+                if any(code[j >> 3] >> (j & 7) & 1 for j in range(i, i + count)):
+                    break
+                starts[i >> 3] |= 1 << (i & 7)
+                for j in range(i, i + count):
+                    code[j >> 3] |= 1 << (j & 7)
+
+                if flags & pcr:
+                    work.append(i + count + self.relative_offset(buffer, pos, count, flags))
+                elif flags & page:
+                    target = self.page_target(buffer, pos, count, origin + i)
+                    work.append((i & ~0xffff) + ((target - origin) & 0xffff))
+                elif flags & jump:
+                    insn = next(self.iter_instructions(buffer, origin + i, pos, pos + count))
+                    value = self.operand_value(insn)
+                    if value > 0xffff:  # A long address, anywhere in the image
+                        work.append(value - origin)
+                    else:
+                        work.append((i & ~0xffff) + ((value - origin) & 0xffff))
+                if flags & stop:
+                    break
+                i += count
+
+        return starts
+
+    def relative_offset(self, buffer, pos, count, flags):
+        """Return the offset of a PC relative instruction.
+
+        The instruction is count bytes at index pos of buffer, and has
+        flags as given by scan. The offset is the last byte, or the last
+        two for longpcr (see longRelativeFormat), and is relative to the
+        next instruction.
+        """
+        if flags & longpcr:
+            if self.longRelativeFormat == "big":
+                value = (buffer[pos + count - 2] << 8) + buffer[pos + count - 1]
+            else:
+                value = (buffer[pos + count - 1] << 8) + buffer[pos + count - 2]
+            return (value ^ 0x8000) - 0x8000
+        return (buffer[pos + count - 1] ^ 0x80) - 0x80
+
+    def page_target(self, buffer, pos, count, address):
+        """Return the address that a jump within a page goes to.
+
+        The instruction is count bytes at index pos of buffer, and at
+        address. Its last byte gives the low eight bits of the target,
+        and the top bits of its opcode any more there are (see
+        pageJumpTable). The rest are those of the address base bytes on
+        from the instruction.
+        """
+        bits, base = self.pageJumps[buffer[pos]]
+        low = buffer[pos + count - 1] | buffer[pos] >> (16 - bits) << 8
+        return ((address + base) & ~((1 << bits) - 1) | low) & 0xffff
+
+    def vectors(self, buffer, origin=None):
+        """Find the code run on reset and interrupts of an image.
+
+        The image in buffer starts at address origin. Returns a list of
+        (name, address) tuples for the vectors in the vectorTable of
+        the plugin that are inside the image, giving the address read
+        from the vector, or the vector itself if the CPU runs the code
+        there (see vectorFormat).
+        """
+        origin = self.origin if origin is None else origin & 0xffff
+        found = []
+        for vector, name in self.vectorTable:
+            pos = vector - origin
+            if self.vectorFormat == "code":
+                if 0 <= pos < len(buffer):
+                    found.append((name, vector))
+            elif 0 <= pos < len(buffer) - 1:
+                if self.vectorFormat == "big":
+                    found.append((name, (buffer[pos] << 8) + buffer[pos + 1]))
+                else:
+                    found.append((name, (buffer[pos + 1] << 8) + buffer[pos]))
+        return found
+
+    def iter_trace(self, buffer, entries, origin=None, start=0, end=None, starts=None):
+        """Generate the instructions reached from entry points, and the data between them.
+
+        Gives an Instruction for each instruction found by trace, and
+        an (address, bytes) tuple for the other bytes of the window, a
+        few at a time. starts may be given from an earlier call of trace
+        with the same arguments, to save tracing again.
+        """
+        size = len(buffer) if end is None else end
+        origin = self.origin if origin is None else origin & 0xffff
+        length = size - start
+        if starts is None:
+            starts = self.trace(buffer, entries, origin, start, end)
+        dataLength = 8 if self.nolist else self.maxLength
+        i = 0
+
+        while i < length:
+            if starts[i >> 3] >> (i & 7) & 1:
+                # Decode from here while each instruction is followed by
+                # another, starting again at the right address if the
+                # address did not go up by the size of an instruction.
+                for insn in self.iter_instructions(buffer, origin + i, start + i, size):
+                    yield insn
+                    i += len(insn.data)
+                    if insn.length != len(insn.data) or i >= length or not starts[i >> 3] >> (i & 7) & 1:
+                        break
+            else:
+                following = next_bit(starts, i, length)
+                while i < following:
+                    data = bytes(buffer[start + i:start + min(i + dataLength, following)])
+                    yield ((origin + i) & 0xffff, data)
+                    i += len(data)
+
+    def format_line(self, insn):
+        "Return the line of output for an Instruction"
+
+        # Disassembly format:
+        # XXXX  XX XX XX XX XX  nop    ($1234,X)
+        # With --nolist option:
+        # nop    ($1234,X)
+
+        # Add current address to output line.
+        if self.nolist:
+            return self.format_text(insn)
+        return hexword[insn.address] + "  " + self.format_text(insn)
+
+    def cached_format_line(self, size):
+        """Return a version of format_line that caches the text after the address.
+
+        The text depends only on the instruction bytes, unless an operand
+        is PC relative, so it is reused when the same instruction is seen
+        again. The size most recently used texts are kept.
+        """
+        cache = collections.OrderedDict()
+        get = cache.get
+        move_to_end = cache.move_to_end
+        popitem = cache.popitem
+        format_text = self.format_text
+        counts = self.cacheCounts
+        nolist = self.nolist
+
+        def format_line(insn):
+            if insn.flags & pcr:
+                text = format_text(insn)
+            else:
+                data = insn.data
+                text = get(data)
+                if text is None:
+                    counts[1] += 1
+                    text = cache[data] = format_text(insn)
+                    if len(cache) > size:
+                        popitem(False)
+                else:
+                    counts[0] += 1
+                    move_to_end(data)
+            if nolist:
+                return text
+            return hexword[insn.address] + "  " + text
+
+        return format_line
+
+    def format_text(self, insn):
+        "Return the text of the line of output for an Instruction after the address"
+        mnemonic = insn.mnemonic
+        operand = insn.operand
+
+        # Each line is built by a single format, rather than by adding
+        # strings together.
+        if self.nolist:
+            if operand:
+                return f" {mnemonic:<5}  {operand}"
+            return " " + mnemonic
+
+        # Add instruction bytes to output line.
+        data = insn.data
+        if data[0] in self.leadInBytes:
+            padding = ""
+            if insn.flags & inv and self.invalid_as_bytes:
+                mnemonic = s[0:(self.maxLength-2)*3] + mnemonic
+        else:
+            padding = self.padding[len(data)]
+
+        # Add mnemonic and any operands to the output line.
+        if operand:
+            return f"{data.hex(' ').upper()}{padding}  {mnemonic:<5}  {operand}"
+        return f"{data.hex(' ').upper()}{padding}  {mnemonic}"
+
+    def operand_value(self, insn):
+        """Return the numeric value of the operand of an Instruction, or None.
+
+        This is the target address for a PC relative operand, otherwise
+        the value given by value_source for the format of the operand.
+        """
+        if insn.target is not None:
+            return insn.target
+
+        # Find the slot for the instruction and the format of its operand.
+        data = insn.data
+        node = self.dispatch
+        slot = node[data[0]]
+        while slot.__class__ is Prefix:
+            node = slot
+            slot = node.load()[data[node.offset]]
+        render = slot[4]
+        if render is None or slot[0] <= 0:
+            return None
+        value = self.values.get(render)
+        if value is None:
+            formats = {function: key for key, function in self.renderers.items()}
+            value = self.values[render] = compile_value(formats[render][0])
+        return value(data[node.prefix - 1:])
+
+    def reference(self, insn):
+        """Return the reference made by the operand of an Instruction, or None.
+
+        Returns a tuple of the address or value referred to, as given
+        by operand_value, and its kind, one of referenceKinds.
+        """
+        if insn.flags & inv:
+            return None
+        data = insn.data
+        opcode = data[0]
+        if opcode in self.leadInBytes and len(data) > 1:
+            opcode = (opcode << 8) + data[1]
+        kind = self.references.get(opcode)
+        if kind is None:
+            return None
+        value = self.operand_value(insn)
+        if value is None:
+            return None
+        return value, kind
+
+    def record(self, insn):
+        "Return the fields of the record for an Instruction, in the order of recordFields"
+        flags = [name for flag, name in flagNames if insn.flags & flag]
+        return (self.cpu, insn.address, insn.data.hex().upper(), len(insn.data), insn.mnemonic, insn.operand, self.operand_value(insn), insn.target, flags)
+
+    def cache_stats(self):
+        "Return a line describing how well the render cache has worked"
+        hits, misses = self.cacheCounts
+        rate = 100.0 * hits / (hits + misses) if hits + misses else 0.0
+        return "render cache: {0:d} hits, {1:d} misses, {2:.1f}% hit rate".format(hits, misses, rate)
+
+    def org_line(self, address):
+        "Return the line giving the initial origin address"
+        if self.nolist:
+            return " .org   ${0:04X}".format(address)
+        else:
+            return "{0:04X}{1:s}.org   ${0:04X}".format(address, s[0:self.maxLength*3+3])
+
+    def end_line(self, address):
+        "Return the line marking the end of the input, or None"
+        if self.nolist:
+            return None
+        else:
+            return "{0:04X}{1:s}end".format(address, s[0:self.maxLength*3+3])
+
+    def data_line(self, address, data):
+        "Return the line of output for bytes that are data rather than code"
+        text = ".byte  " + ",".join("$" + hexbyte[byte] for byte in data)
+        if self.nolist:
+            return " " + text
+        return f"{hexword[address]}  {data.hex(' ').upper()}{self.padding[len(data)]}  {text}"
+
+    def label_line(self, address, name):
+        "Return the line defining a label at an address"
+        if self.nolist:
+            return name + ":"
+        return "{0:04X}{1:s}{2:s}:".format(address, s[0:self.maxLength*3+3], name)
+
+    def lines(self, buffer, origin=None):
+        "Generate the lines of output for the instructions in buffer"
+        address = self.origin if origin is None else origin & 0xffff
+        pos = 0
+
+        yield self.org_line(address)
+
+        for insn in self.iter_instructions(buffer, address):
+            yield self.format_line(insn)
+            pos += len(insn.data)
+            address = (insn.address + insn.length) & 0xffff
+
+        # Mark the end, unless the last instruction was cut short.
+        end = self.end_line(address)
+        if end is not None and pos == len(buffer):
+            yield end
+
+
+class InstructionTable:
+    """The instructions in a buffer, held in parallel arrays.
+
+    Takes a few bytes per instruction, instead of an Instruction object
+    (and its bytes and strings) for each one, so that the disassembly of
+    a large image can be kept in memory. Indexing gives an Instruction,
+    decoded again from the buffer, and slicing gives a new table.
+    """
+
+    # Columns, each an array with one item per instruction:
+    # offset - index in buffer of the first byte of the instruction
+    # length - number of bytes in the instruction
+    # entry - index in entries of the mnemonic
+    # value - numeric value of the operand (see operand_value), or noValue
+    # target - resolved address for PC relative instructions, or -1
+    # flags - flags of the instruction
+    # address - address of the instruction, counted on from the origin
+    #           without wrapping at 64K, so that it always increases
+    columns = (("offset", "I"), ("length", "B"), ("entry", "H"), ("value", "I"), ("target", "i"), ("flags", "B"), ("address", "I"))
+
+    noValue = 0xffffffff
+
+    def __init__(self, disassembler, buffer, origin=None, start=0, end=None):
+        self.disassembler = disassembler
+        self.buffer = buffer
+        self.entries = []  # Distinct mnemonics, in order of first use
+        for name, code in self.columns:
+            setattr(self, name, array.array(code))
+
+        entries = {}
+        operand_value = disassembler.operand_value
+        noValue = self.noValue
+        offset = self.offset.append
+        length = self.length.append
+        entry = self.entry.append
+        value = self.value.append
+        target = self.target.append
+        flags = self.flags.append
+        address = self.address.append
+        pos = start
+        linear = disassembler.origin if origin is None else origin & 0xffff
+
+        for insn in disassembler.iter_instructions(buffer, origin, start, end):
+            index = entries.get(insn.mnemonic)
+            if index is None:
+                index = entries[insn.mnemonic] = len(self.entries)
+                self.entries.append(insn.mnemonic)
+            data = insn.data
+            v = operand_value(insn)
+            offset(pos)
+            length(len(data))
+            entry(index)
+            value(noValue if v is None else v)
+            target(-1 if insn.target is None else insn.target)
+            flags(insn.flags)
+            address(linear)
+            pos += len(data)
+            linear += insn.length
+
+    def __len__(self):
+        return len(self.offset)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            table = object.__new__(InstructionTable)
+            table.__dict__.update(self.__dict__)
+            for name, code in self.columns:
+                setattr(table, name, getattr(self, name)[index])
+            return table
+        pos = self.offset[index]
+        return next(self.disassembler.iter_instructions(self.buffer, self.address[index], pos, pos + self.length[index]))
+
+    def mnemonic(self, index):
+        "Return the mnemonic of the instruction at index, without decoding it"
+        return self.entries[self.entry[index]]
+
+    def find(self, address):
+        """Return the index of the instruction that address is in, or -1.
+
+        address is counted on from the origin without wrapping, as in
+        the address column.
+        """
+        index = bisect.bisect_right(self.address, address) - 1
+        if index < 0 or address >= self.address[index] + self.length[index]:
+            return -1
+        # A lead-in instruction can share its address with the next one.
+        return bisect.bisect_left(self.address, self.address[index], 0, index)
+
+    def numpy(self):
+        """Return a dict of NumPy arrays sharing memory with the columns.
+
+        Needs NumPy, which is otherwise only used if it is installed, to
+        speed up Disassembler.scan.
+        """
+        import numpy
+        return {name: numpy.frombuffer(getattr(self, name), dtype=code) for name, code in self.columns}
+
+
+class Statistics:
+    """Counts of the instructions disassembled, and the time taken by each phase.
+
+    Collects nothing unless it is attached to a Disassembler with
+    attach, so there is no cost when it is not used.
+    """
+
+    # Phases, in the order they are reported:
+    # load - loading the plugin and building the tables
+    # read - reading standard input
+    # decode - decoding instructions
+    # format - making lines or records, and anything else not timed
+    # write - writing the output
+    # stats - counting the instructions for these statistics
+    #
+    # Instructions are only counted by opcode as they are output. The
+    # other counts are worked out from those at the end.
+    phases = ("load", "read", "decode", "format", "write", "stats")
+
+    def __init__(self):
+        self.opcodes = collections.Counter()
+        self.mnemonics = collections.Counter()
+        self.modes = collections.Counter()
+        self.prefixes = collections.Counter()
+        self.instructions = 0
+        self.bytes = 0
+        self.lines = 0
+        self.invalid = 0
+        self.undocumented = 0
+        self.times = dict.fromkeys(self.phases, 0.0)
+        self.pending = []  # Instructions output but not yet counted
+        self.disassembler = None
+
+    def attach(self, disassembler):
+        """Time decoding and count the instructions output by a Disassembler.
+
+        Replaces its decode, format_line and record methods with ones
+        that do this as well.
+        """
+        self.disassembler = disassembler
+        decode = disassembler.decode
+        format_line = disassembler.format_line
+        record = disassembler.record
+        times = self.times
+        pending = self.pending
+
+        def timed_decode(buffer, pos, size, address):
+            # Decode in small batches, as iter_stream stops before the
+            # end and decodes the rest again with the next block.
+            instructions = decode(buffer, pos, size, address)
+            while True:
+                start = time.perf_counter()
+                batch = list(itertools.islice(instructions, 256))
+                times["decode"] += time.perf_counter() - start
+                if not batch:
+                    return
+                yield from batch
+
+        def counted_format_line(insn):
+            pending.append(insn)
+            return format_line(insn)
+
+        def counted_record(insn):
+            pending.append(insn)
+            return record(insn)
+
+        disassembler.decode = timed_decode
+        disassembler.format_line = counted_format_line
+        disassembler.record = counted_record
+
+    def output(self, out):
+        "Return a file object that writes to out, counting lines and timing writes"
+        def write(text):
+            if len(self.pending) >= outputBatch:
+                self.count()
+            start = time.perf_counter()
+            out.write(text)
+            self.times["write"] += time.perf_counter() - start
+            self.lines += text.count("\n")
+
+        def flush():
+            start = time.perf_counter()
+            out.flush()
+            self.times["write"] += time.perf_counter() - start
+
+        return types.SimpleNamespace(write=write, flush=flush)
+
+    def input(self, stream):
+        "Return a file object that reads from stream, timing reads"
+        def read(size=-1):
+            start = time.perf_counter()
+            data = stream.read(size)
+            self.times["read"] += time.perf_counter() - start
+            return data
+        return types.SimpleNamespace(read=read)
+
+    def count(self):
+        "Add the instructions output since the last call to the counts by opcode"
+        start = time.perf_counter()
+        pending = self.pending
+        opcodes = self.opcodes
+        self.instructions += len(pending)
+        self.bytes += sum(len(insn.data) for insn in pending)
+        opcodes.update(insn.data[0] for insn in pending)
+
+        # Count instructions with a leadin byte by their full opcode.
+        leadInBytes = self.disassembler.leadInBytes
+        if leadInBytes:
+            table = self.disassembler.opcodeTable
+            for data in [insn.data for insn in pending if insn.data[0] in leadInBytes]:
+                opcode = (data[0] << 8) + data[1]
+                entry = table.get(opcode)
+                if entry is not None and len(entry) > 3 and entry[3] & z80bit and len(data) > 3:
+                    opcode = (opcode << 16) + data[3]
+                opcodes[opcode] += 1
+                opcodes[data[0]] -= 1
+
+        pending.clear()
+        self.times["stats"] += time.perf_counter() - start
+
+    def tally(self):
+        "Work out the counts by mnemonic, addressing mode and prefix from those by opcode"
+        table = self.disassembler.opcodeTable
+        for opcode, number in self.opcodes.items():
+            if number == 0:
+                continue
+            if opcode > 0xff:
+                self.prefixes["{0:02X}".format(opcode >> 24 if opcode > 0xffff else opcode >> 8)] += number
+            entry = table.get(opcode)
+            flags = entry[3] if entry is not None and len(entry) > 3 else 0
+            if flags & und:
+                self.undocumented += number
+            if entry is None or flags & und and not self.disassembler.undocumented:
+                self.invalid += number
+            else:
+                self.mnemonics[entry[1]] += number
+                self.modes[entry[2]] += number
+
+    def finish(self, elapsed):
+        """Count any instructions left, given the time taken to disassemble.
+
+        The time not spent in the other phases is put down to format.
+        """
+        self.count()
+        self.tally()
+        others = sum(self.times[phase] for phase in ("read", "decode", "write", "stats"))
+        self.times["format"] = max(elapsed - others, 0.0)
+
+    def summary(self):
+        "Return the statistics as a dictionary, for --stats json"
+        total = sum(self.times.values())
+        return {
+            "cpu": self.disassembler.cpu,
+            "instructions": self.instructions,
+            "bytes": self.bytes,
+            "lines": self.lines,
+            "invalid": self.invalid,
+            "undocumented": self.undocumented,
+            "seconds": self.times,
+            "bytes_per_second": self.bytes / total if total else 0.0,
+            "mnemonics": dict(self.mnemonics.most_common()),
+            "modes": dict(self.modes.most_common()),
+            "prefixes": dict(self.prefixes.most_common()),
+        }
+
+    def report(self):
+        "Generate the lines of the statistics as text, for --stats"
+        total = sum(self.times.values())
+        rate = self.bytes / total / 1024 if total else 0.0
+        yield "{0:d} instructions, {1:d} bytes, {2:d} lines, {3:.0f} KB/s".format(self.instructions, self.bytes, self.lines, rate)
+        yield "{0:d} invalid, {1:d} undocumented".format(self.invalid, self.undocumented)
+        yield "time: " + ", ".join("{0:s} {1:.3f}s".format(phase, self.times[phase]) for phase in self.phases) + ", total {0:.3f}s".format(total)
+        for title, counter in (("mnemonic", self.mnemonics), ("mode", self.modes), ("prefix", self.prefixes)):
+            if counter:
+                yield ""
+                yield "{0:24s} {1:>10s} {2:>7s}".format(title, "count", "%")
+                for key, number in counter.most_common():
+                    yield "{0:24s} {1:10d} {2:6.2f}%".format(key, number, 100.0 * number / self.instructions)
+
+
+# Results of earlier runs are kept in resultDir, which is held to
+# resultCacheSize bytes by removing those least recently used. Results
+# left half written by a run that was killed are removed once they are
+# resultTempAge seconds old.
+resultDir = os.path.join(cacheDir, "results")
+resultCacheSize = 256 * 1024 * 1024
+resultTempAge = 24 * 60 * 60
+
+
+class ResultCache:
+    """A cache of the output of earlier runs, looked up by a hash of the input.
+
+    Each result is a file in directory, named after a SHA-256 hash of
+    the input bytes, the CPU plugin, this program and the options that
+    change the output. Its first line is the number of instructions,
+    and the rest is the output. Using a result updates its time, and
+    adding one removes the least recently used until all of them take
+    no more than limit bytes.
+    """
+
+    def __init__(self, directory=resultDir, limit=resultCacheSize):
+        self.directory = directory
+        self.limit = limit
+        self.pending = None  # (key, file name, file) of a result being written
+
+    def key(self, buffer, cpu, options, start=0, end=None):
+        "Return the key for disassembling start to end of buffer for a CPU with options"
+        import hashlib
+        digest = hashlib.sha256()
+        for path in (os.path.realpath(__file__), plugin_path(cpu)):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digest.update(repr((__version__, cpu, options)).encode())
+        with memoryview(buffer) as view, view[start:end] as window:
+            digest.update(window)
+        return digest.hexdigest()
+
+    def path(self, key):
+        "Return the file name of the result with a key"
+        return os.path.join(self.directory, key + ".out")
+
+    def get(self, key, out):
+        """Write the result with a key to a file, a block at a time.
+
+        Returns the number of instructions, or None if there is no
+        such result.
+        """
+        import shutil
+        path = self.path(key)
+        try:
+            with open(path, newline="") as f:
+                count = int(f.readline())
+                shutil.copyfileobj(f, out, outputBuffer)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return count
+
+    def record(self, key, out):
+        """Return a file object that writes to out and to a new result with a key.
+
+        The result is added to the cache by save, or thrown away by
+        discard. If the cache can't be written to, returns out itself
+        and there is nothing to save. If writing the result fails, or
+        it grows larger than limit, it is thrown away and the rest of
+        the output only goes to out.
+        """
+        import tempfile
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temp = tempfile.mkstemp(".tmp", dir=self.directory)
+        except OSError:
+            return out
+        f = open(handle, "w", buffering=outputBuffer, newline="")
+        self.pending = (key, temp, f)
+        size = 0
+
+        def write(text):
+            nonlocal size
+            out.write(text)
+            if self.pending is None:
+                return
+            size += len(text)
+            if size > self.limit:  # Would only be evicted
+                self.discard()
+                return
+            try:
+                f.write(text)
+            except OSError:
+                self.discard()
+
+        try:
+            f.write(" " * 20 + "\n")  # Room for the number of instructions
+        except OSError:
+            self.discard()
+            return out
+
+        return types.SimpleNamespace(write=write, flush=out.flush)
+
+    def save(self, count):
+        "Add the result being written by record, with the number of instructions"
+        if self.pending is None:
+            return
+        key, temp, f = self.pending
+        try:
+            f.seek(0)
+            f.write("{0:20d}".format(count))
+            f.close()
+            os.replace(temp, self.path(key))
+        except OSError:
+            self.discard()
+            return
+        self.pending = None
+        try:
+            self.evict()
+        except OSError:
+            pass
+
+    def discard(self):
+        "Throw away the result being written by record, if there is one"
+        if self.pending is None:
+            return
+        key, temp, f = self.pending
+        self.pending = None
+        try:
+            f.close()
+        except OSError:  # Unwritten output left in the buffer
+            pass
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+
+    def evict(self):
+        "Remove the least recently used results until the rest fit in limit"
+        results = []
+        stale = time.time() - resultTempAge
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    info = entry.stat()
+                    if entry.name.endswith(".out"):
+                        results.append((info.st_mtime_ns, info.st_size, entry.path))
+                    elif entry.name.endswith(".tmp") and info.st_mtime < stale:
+                        os.remove(entry.path)
+                except OSError:  # Removed by another process
+                    continue
+        total = sum(size for used, size, path in results)
+        for used, size, path in sorted(results):
+            if total <= self.limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        "Remove all results, and any left half written. Returns the number removed"
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if entry.name.endswith((".out", ".tmp")):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:  # Removed by another process
+                    continue
+                removed += 1
+        return removed
+
+
+# Lines are written in batches of outputBatch lines, and files are
+# written through a buffer of outputBuffer bytes.
+outputBatch = 4096
+outputBuffer = 1024 * 1024
+
+# Rows are added to cross reference databases in batches of xrefBatch.
+xrefBatch = 10000
+
+
+def write_lines(out, lines):
+    "Write a list of lines to a file in one call, then empty the list"
+    lines.append("")
+    out.write("\n".join(lines))
+    lines.clear()
+
+
+def map_file(filename):
+    """Return the contents of a file as a read only memory map.
+
+    Only the parts of the file that are used get read from disk. An
+    empty file, which can't be mapped, gives an empty bytes object.
+    """
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_blocks(stream, size=65536):
+    "Generate blocks of up to size bytes read from a binary stream until end of file"
+    while True:
+        block = stream.read(size)
+        if not block:
+            return
+        yield block
+
+
+def write_listing(disassembler, buffer, out, origin=None, start=0, end=None):
+    """Write the lines for the instructions in buffer to a file.
+
+    Disassembles from index start to end of buffer, where the byte at
+    start is at address origin. Returns the number of instructions.
+    """
+    address = disassembler.origin if origin is None else origin & 0xffff
+    if end is None:
+        end = len(buffer)
+    format_line = disassembler.format_line
+    lines = [disassembler.org_line(address)]
+    pos = start
+    count = 0
+
+    for count, insn in enumerate(disassembler.iter_instructions(buffer, address, start, end), 1):
+        lines.append(format_line(insn))
+        pos += len(insn.data)
+        if len(lines) >= outputBatch:
+            write_lines(out, lines)
+    if count:
+        address = (insn.address + insn.length) & 0xffff
+
+    # Mark the end, unless the last instruction was cut short.
+    line = disassembler.end_line(address)
+    if line is not None and pos == end:
+        lines.append(line)
+    write_lines(out, lines)
+
+    return count
+
+
+def stream_listing(disassembler, stream, out, origin=None, blockSize=65536):
+    """Write the lines for the instructions read from a binary stream to a file.
+
+    The stream is read and disassembled a block at a time, so any
+    length of input can be handled in a fixed amount of memory. Returns
+    the number of instructions.
+    """
+    address = disassembler.origin if origin is None else origin & 0xffff
+    pos = 0
+    size = 0
+    count = 0
+
+    def counted(blocks):
+        nonlocal size
+        for block in blocks:
+            size += len(block)
+            yield block
+
+    format_line = disassembler.format_line
+    lines = [disassembler.org_line(address)]
+
+    for count, insn in enumerate(disassembler.iter_stream(counted(read_blocks(stream, blockSize)), address), 1):
+        lines.append(format_line(insn))
+        pos += len(insn.data)
+        if len(lines) >= outputBatch:
+            write_lines(out, lines)
+    if count:
+        address = (insn.address + insn.length) & 0xffff
+
+    # Mark the end, unless the last instruction was cut short.
+    line = disassembler.end_line(address)
+    if line is not None and pos == size:
+        lines.append(line)
+    write_lines(out, lines)
+
+    return count
+
+
+def write_trace(disassembler, buffer, out, entries, origin=None, start=0, end=None):
+    """Write the lines for the code reached from entry points in buffer to a file.
+
+    The other bytes from index start to end of buffer are written as
+    data. See Disassembler.trace. Returns the number of instructions.
+    """
+    address = disassembler.origin if origin is None else origin & 0xffff
+    if end is None:
+        end = len(buffer)
+    format_line = disassembler.format_line
+    data_line = disassembler.data_line
+    lines = [disassembler.org_line(address)]
+    count = 0
+
+    for item in disassembler.iter_trace(buffer, entries, address, start, end):
+        if item.__class__ is Instruction:
+            lines.append(format_line(item))
+            count += 1
+        else:
+            lines.append(data_line(*item))
+        if len(lines) >= outputBatch:
+            write_lines(out, lines)
+
+    line = disassembler.end_line((address + end - start) & 0xffff)
+    if line is not None:
+        lines.append(line)
+    write_lines(out, lines)
+
+    return count
+
+
+def line_offsets(items, origin):
+    """Generate the offset from origin of each item of a listing, with the item.
+
+    The items are Instructions and (address, bytes) tuples of data, as
+    given by iter_instructions or iter_trace starting at address origin.
+    The offsets go on past $FFFF, so they are different for each item
+    of an input larger than 64K.
+    """
+    offset = 0
+    last = origin
+    for item in items:
+        address = item.address if item.__class__ is Instruction else item[0]
+        offset += (address - last) & 0xffff
+        last = address
+        yield offset, item
+
+
+def branch_target(disassembler, insn, offset, origin):
+    """Return where a branch or jump goes to, or None if it isn't one.
+
+    insn is at offset from address origin, as given by line_offsets.
+    Returns a tuple of the offset of the target, taken to be in the
+    same 64K as the instruction unless the operand shows a 24-bit
+    address, and the text of the address in its operand. Also returns None if the operand does not show the address.
+    """
+    if insn.flags & inv:
+        return None
+    if insn.flags & pcr:
+        value = insn.target
+        target = offset + ((value - insn.address + 0x8000) & 0xffff) - 0x8000
+    elif insn.flags & jump:
+        value = disassembler.operand_value(insn)
+        if value is None:
+            return None
+        text = "$" + format(value, "06X")
+        if text in insn.operand:  # A long address, anywhere in the image
+            return value - origin, text
+        target = offset - ((origin + offset) & 0xffff) + (value & 0xffff)
+    else:
+        return None
+    text = "$" + format(value, "04X")
+    if text not in insn.operand:
+        return None
+    return target, text
+
+
+def label_targets(disassembler, items, origin, size):
+    """Find where to put labels in a listing, the first pass of write_labelled.
+
+    Returns two bitsets with a bit for each address from origin up to
+    size bytes later: one set where a line of the listing starts, and
+    one set where a branch or jump goes to.
+    """
+    starts = bytearray((size + 7) >> 3)
+    targets = bytearray(len(starts))
+
+    for offset, item in line_offsets(items, origin):
+        if 0 <= offset < size:
+            starts[offset >> 3] |= 1 << (offset & 7)
+        if item.__class__ is Instruction:
+            branch = branch_target(disassembler, item, offset, origin)
+            if branch is not None and 0 <= branch[0] < size:
+                targets[branch[0] >> 3] |= 1 << (branch[0] & 7)
+
+    return starts, targets
+
+
+def scan_targets(disassembler, buffer, origin, start, end):
+    """Find where to put labels in a listing of a window of buffer.
+
+    Gives the same bitsets as label_targets would for the instructions
+    from index start to end of buffer, but faster, as the instructions
+    are found with Disassembler.scan and only branches and jumps are
+    decoded.
+    """
+    size = end - start
+    starts = bytearray((size + 7) >> 3)
+    targets = bytearray(len(starts))
+    counts, advances, flags = disassembler.scan(buffer, start, end)
+    branches = pcr | jump
+    iter_instructions = disassembler.iter_instructions
+    i = 0
+    offset = 0
+
+    while i < len(counts):
+        count = counts[i]
+        if not count:  # Unexpected EOF
+            break
+        starts[offset >> 3] |= 1 << (offset & 7)
+        if flags[i] & branches:
+            insn = next(iter_instructions(buffer, origin + offset, start + i, start + i + count))
+            branch = branch_target(disassembler, insn, offset, origin)
+            if branch is not None and 0 <= branch[0] < size:
+                targets[branch[0] >> 3] |= 1 << (branch[0] & 7)
+        offset += advances[i]
+        i += count
+
+    return starts, targets
+
+
+def write_labelled(disassembler, buffer, out, origin=None, start=0, end=None, entries=None):
+    """Write the lines for the instructions in buffer to a file, with labels.
+
+    Like write_listing, or write_trace if entries is given, except that
+    the targets of branches and jumps that are the start of a line get
+    a label, named after their address, which replaces the address in
+    the operand. The listing is made twice: first to find the targets,
+    kept as bitsets with a bit per address (see label_targets), and
+    then to write it. Returns the number of instructions.
+    """
+    address = disassembler.origin if origin is None else origin & 0xffff
+    if end is None:
+        end = len(buffer)
+    size = end - start
+    format_line = disassembler.format_line
+    data_line = disassembler.data_line
+    label_line = disassembler.label_line
+    lines = [disassembler.org_line(address)]
+    pos = start
+    count = 0
+
+    if entries is None:
+        starts, targets = scan_targets(disassembler, buffer, address, start, end)
+        items = disassembler.iter_instructions(buffer, address, start, end)
+    else:
+        traced = disassembler.trace(buffer, entries, address, start, end)
+        starts, targets = label_targets(disassembler, disassembler.iter_trace(buffer, entries, address, start, end, traced), address, size)
+        items = disassembler.iter_trace(buffer, entries, address, start, end, traced)
+
+    # Labels are named after their address, with the bank as well if
+    # the same address could be in the input more than once.
+    if size > 0x10000:
+        def name(offset):
+            return "L{0:06X}".format(address + offset)
+    else:
+        def name(offset):
+            return "L" + hexword[(address + offset) & 0xffff]
+
+    for offset, item in line_offsets(items, address):
+        if 0 <= offset < size and targets[offset >> 3] >> (offset & 7) & 1:
+            # Define the label once, at the first line at its address.
+            targets[offset >> 3] &= ~(1 << (offset & 7))
+            lines.append(label_line(item.address if item.__class__ is Instruction else item[0], name(offset)))
+        if item.__class__ is Instruction:
+            line = format_line(item)
+            branch = branch_target(disassembler, item, offset, address)
+            if branch is not None and 0 <= branch[0] < size and starts[branch[0] >> 3] >> (branch[0] & 7) & 1:
+                head, text, tail = line.rpartition(branch[1])
+                line = head + name(branch[0]) + tail
+            lines.append(line)
+            count += 1
+            pos += len(item.data)
+            last = item
+        else:
+            lines.append(data_line(*item))
+            pos += len(item[1])
+        if len(lines) >= outputBatch:
+            write_lines(out, lines)
+
+    # Mark the end, unless the last instruction was cut short.
+    if entries is not None:
+        line = disassembler.end_line((address + size) & 0xffff)
+    elif count:
+        line = disassembler.end_line((last.address + last.length) & 0xffff)
+    else:
+        line = disassembler.end_line(address)
+    if line is not None and pos == end:
+        lines.append(line)
+    write_lines(out, lines)
+
+    return count
+
+
+def write_records(disassembler, instructions, out, format="jsonl"):
+    """Write a record for each Instruction to a file. Returns the number of records.
+
+    format is jsonl for a JSON object on each line, or csv or tsv for
+    comma or tab separated values with a header line. The fields are
+    given by Disassembler.record.
+    """
+    import csv
+    import json
+    record = disassembler.record
+    count = 0
+    if format == "jsonl":
+        lines = []
+        for count, insn in enumerate(instructions, 1):
+            lines.append(json.dumps(dict(zip(recordFields, record(insn)))))
+            if len(lines) >= outputBatch:
+                write_lines(out, lines)
+        if lines:
+            write_lines(out, lines)
+    else:
+        writer = csv.writer(out, delimiter="\t" if format == "tsv" else ",", lineterminator="\n")
+        writer.writerow(recordFields)
+        for count, insn in enumerate(instructions, 1):
+            fields = record(insn)
+            writer.writerow(fields[:-1] + (",".join(fields[-1]),))
+    return count
+
+
+# Disassembler and input for a worker process decoding part of a file.
+chunkWorker = None
+
+# Smallest file worth splitting among processes with --jobs.
+parallelMinimum = 1024 * 1024
+
+
+def write_xref(disassembler, items, filename, start=0):
+    """Write a cross reference database of the references made by instructions.
+
+    items are Instructions and (address, bytes) tuples of data, as
+    given by iter_instructions or iter_trace for the part of the input
+    from index start. The SQLite database in filename gets a refs table
+    with the offset in the input and address of each instruction that
+    refers to an address or value, what it refers to, the kind of
+    reference (see Disassembler.reference) and the instruction, indexed
+    by target and by source. The rows are inserted xrefBatch at a time,
+    and the indexes made at the end. Any tables already there are
+    replaced. Returns the number of references.
+    """
+    import sqlite3
+    reference = disassembler.reference
+    rows = []
+    count = 0
+    pos = start
+
+    connection = sqlite3.connect(filename)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS refs")
+            connection.execute("DROP TABLE IF EXISTS info")
+            connection.execute("CREATE TABLE refs (offset INTEGER, source INTEGER, target INTEGER, kind TEXT, instruction TEXT)")
+            connection.execute("CREATE TABLE info (name TEXT PRIMARY KEY, value)")
+            connection.executemany("INSERT INTO info VALUES (?, ?)", [("cpu", disassembler.cpu), ("version", __version__)])
+
+            for item in items:
+                if item.__class__ is not Instruction:
+                    pos += len(item[1])
+                    continue
+                found = reference(item)
+                if found is not None:
+                    text = "{0:<5s}  {1:s}".format(item.mnemonic, item.operand) if item.operand else item.mnemonic
+                    rows.append((pos, item.address, found[0], found[1], text))
+                    if len(rows) >= xrefBatch:
+                        connection.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?)", rows)
+                        count += len(rows)
+                        rows.clear()
+                pos += len(item.data)
+
+            connection.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?)", rows)
+            count += len(rows)
+            connection.execute("CREATE INDEX refs_target ON refs (target, source)")
+            connection.execute("CREATE INDEX refs_source ON refs (source)")
+    finally:
+        connection.close()
+
+    return count
+
+
+def query_xref(filename, address, source=False):
+    """Return the references to an address in a cross reference database.
+
+    The database is one written by write_xref. If source is true, gives
+    the references made by the instructions at the address instead.
+    Returns a list of (source, target, kind, instruction) tuples, in
+    order of source address.
+    """
+    import sqlite3
+    if not os.path.exists(filename):
+        raise FileNotFoundError("no such database: '{0:s}'".format(filename))
+    connection = sqlite3.connect(filename)
+    try:
+        column = "source" if source else "target"
+        return connection.execute("SELECT source, target, kind, instruction FROM refs WHERE {0:s} = ? ORDER BY source, offset".format(column), (address,)).fetchall()
+    finally:
+        connection.close()
+
+
+def xref(argv):
+    """Run the xref command, which looks up addresses in a cross reference database.
+
+    argv are the arguments after the command name. Returns the exit
+    status: 0 if any references were found, otherwise 1.
+    """
+    import sqlite3
+    parser = argparse.ArgumentParser(prog="udis.py xref", description="List the instructions that refer to an address, from a database written with --xref")
+    parser.add_argument("database", help="Cross reference database")
+    parser.add_argument("address", help="Address to look up", nargs="+", type=auto_int)
+    parser.add_argument("--from", help="List the references made by the instructions at the addresses instead", action="store_true", dest="source")
+    args = parser.parse_args(argv)
+
+    found = False
+    for address in args.address:
+        try:
+            rows = query_xref(args.database, address, args.source)
+        except (OSError, sqlite3.Error) as e:
+            print("error: " + str(e), file=sys.stderr)
+            return 2
+        for source, target, kind, text in rows:
+            print("{0:04X}  {1:04X}  {2:<9s}  {3:s}".format(source, target, kind, text))
+            found = True
+    return 0 if found else 1
+
+
+def init_chunk_worker(filename, cpu, undocumented, invalid_as_bytes, nolist, render_cache):
+    "Load the tables and map the input file in a worker process"
+    global chunkWorker
+    chunkWorker = (Disassembler(cpu, 0, undocumented, invalid_as_bytes, nolist, render_cache=render_cache), map_file(filename))
+
+
+def scan_chunk(start, stop, end=None, work=None):
+    """Find instruction boundaries in a chunk of the input.
+
+    Decodes from start, which is assumed to be the start of an
+    instruction, up to and including the first instruction that starts
+    at or after stop, but not past the end of the input at end. Returns
+    arrays as given by boundaries.
+    """
+    disassembler, buffer = work or chunkWorker
+    return disassembler.boundaries(buffer, start, end, stop)
+
+
+def render_chunk(start, end, address, work=None):
+    """Return the lines for the instructions from index start to end.
+
+    Also returns the index and address after the last instruction.
+    """
+    disassembler, buffer = work or chunkWorker
+    format_line = disassembler.format_line
+    lines = []
+    pos = start
+    for insn in disassembler.iter_instructions(buffer, address, start, end):
+        lines.append(format_line(insn))
+        pos += len(insn.data)
+        address = (insn.address + insn.length) & 0xffff
+    if lines:
+        lines.append("")
+    return "\n".join(lines), pos, address
+
+
+def join_chunks(disassembler, buffer, bounds, scans, origin):
+    """Join up instruction boundaries found separately for each chunk.
+
+    bounds gives the index of the start of each chunk, followed by the
+    end of the input. scans gives the result of scan_chunk for each
+    chunk, which is only correct for the first chunk. Returns a list of
+    the index and address of the first correct instruction of each
+    chunk that could be joined to the one before.
+    """
+    # starts[first:] and addresses[first:] describe the instructions
+    # known to be correct, the first of which is at address.
+    parts = [(bounds[0], origin)]
+    starts, addresses = scans[0]
+    first = 0
+    address = origin
+    for i in range(1, len(scans)):
+        if len(starts) == 0 or starts[-1] < bounds[i]:
+            break  # Last instruction was cut short by end of file
+
+        # First instruction at or after the start of this chunk.
+        address = (address + addresses[-1] - addresses[first]) & 0xffff
+        pos = starts[-1]
+
+        # Decode from there until reaching an instruction found by
+        # the worker for this chunk.
+        nextStarts, nextAddresses = scans[i]
+        k = bisect.bisect_left(nextStarts, pos)
+        insn = True
+        while k < len(nextStarts) and nextStarts[k] != pos:
+            insn = next(disassembler.iter_instructions(buffer, address, pos, bounds[-1]), None)
+            if insn is None:
+                break
+            pos += len(insn.data)
+            address = (address + insn.length) & 0xffff
+            k = bisect.bisect_left(nextStarts, pos)
+
+        if insn is None:
+            break  # Last instruction was cut short by end of file
+        elif k < len(nextStarts) and nextStarts[k] == pos:
+            parts.append((pos, address))
+            starts, addresses = nextStarts, nextAddresses
+            first = k
+        else:
+            # No instruction in common, so decode this chunk again
+            # from the correct place as part of the previous one.
+            starts, addresses = scan_chunk(pos, bounds[i + 1], bounds[-1], (disassembler, buffer))
+            first = 0
+
+    return parts
+
+
+def load_index(filename, key):
+    "Return the instruction boundaries saved in an index file, or None"
+    try:
+        with open(filename, "rb") as f:
+            saved = marshal.loads(f.read())
+        if saved[0] != key:
+            return None
+        starts = array.array("I")
+        starts.frombytes(saved[1])
+        addresses = array.array("H")
+        addresses.frombytes(saved[2])
+        return starts, addresses
+    except (OSError, EOFError, ValueError, TypeError, IndexError):
+        return None
+
+
+def save_index(filename, key, starts, addresses):
+    "Save instruction boundaries to an index file"
+    with open(filename, "wb") as f:
+        f.write(marshal.dumps((key, starts.tobytes(), addresses.tobytes())))
+
+
+def parallel_listing(filename, cpu, origin, out, jobs, undocumented=False, invalid_as_bytes=True, nolist=False, chunkSize=None, index=None, start=0, end=None, render_cache=4096):
+    """Write the disassembly of a large file, decoding it in parallel.
+
+    First the instruction boundaries are found, then worker processes
+    produce the lines for the instructions in different parts of the
+    file. The output is the same as for write_listing, which also
+    describes start and end. Returns the number of instructions.
+
+    If index names a file, the boundaries of all instructions are found
+    in one pass and saved to it, or read from it if it was saved before
+    for the same file and options. Otherwise the file is split into
+    chunks and workers find the instruction boundaries in each chunk,
+    starting at the beginning of the chunk. That guess is usually wrong
+    for the first few instructions, but a stream of instructions soon
+    falls into step with the one decoded from the previous chunk. The
+    chunks are joined at the first instruction the two have in common.
+    """
+    import concurrent.futures
+    options = (undocumented, invalid_as_bytes, nolist, render_cache)
+    disassembler = get_disassembler(cpu, *options)
+    origin &= 0xffff
+
+    info = os.stat(filename)
+    buffer = map_file(filename)
+    end = len(buffer) if end is None else min(end, len(buffer))
+    if start >= end:
+        return write_listing(disassembler, buffer, out, origin, start, end)
+
+    if chunkSize is None:
+        chunkSize = max(65536, -(-(end - start) // (jobs * 4)))
+
+    with concurrent.futures.ProcessPoolExecutor(jobs, initializer=init_chunk_worker, initargs=(filename, cpu) + options) as pool:
+        if index:
+            # The number of bytes does not depend on invalid_as_bytes.
+            key = (__version__, cpu, undocumented, nolist, info.st_size, info.st_mtime_ns, start, end)
+            found = load_index(index, key)
+            if found is None:
+                found = disassembler.boundaries(buffer, start, end)
+                save_index(index, key, *found)
+            starts, addresses = found
+
+            # Parts with equal numbers of instructions.
+            step = max(1, -(-len(starts) // (jobs * 4)))
+            parts = [(starts[i], (origin + addresses[i]) & 0xffff) for i in range(0, len(starts), step)] or [(start, origin)]
+        else:
+            bounds = list(range(start, end, chunkSize)) + [end]
+            scans = list(pool.map(scan_chunk, bounds[:-1], bounds[1:], [end] * (len(bounds) - 1)))
+            parts = join_chunks(disassembler, buffer, bounds, scans, origin)
+
+        ends = [part[0] for part in parts[1:]] + [end]
+        rendered = list(pool.map(render_chunk, [part[0] for part in parts], ends, [part[1] for part in parts]))
+
+    out.write(disassembler.org_line(origin) + "\n")
+    count = 0
+    for text, pos, address in rendered:
+        out.write(text)
+        count += text.count("\n")
+
+    # Mark the end, unless the last instruction was cut short.
+    line = disassembler.end_line(address)
+    if line is not None and pos == end:
+        out.write(line + "\n")
+
+    return count
+
+
+# Disassemblers loaded by get_disassembler, so that tables are loaded
+# once for each CPU in batch mode.
+disassemblers = {}
+
+
+def get_disassembler(cpu, undocumented=False, invalid_as_bytes=True, nolist=False, render_cache=4096):
+    "Return a Disassembler for a CPU, reusing one already loaded with the same options"
+    key = (cpu, undocumented, invalid_as_bytes, nolist, render_cache)
+    disassembler = disassemblers.get(key)
+    if disassembler is None:
+        disassembler = disassemblers[key] = Disassembler(cpu, 0, undocumented, invalid_as_bytes, nolist, render_cache=render_cache)
+    return disassembler
+
+
+def plugin_names():
+    "Return the names of the CPUs of all the plugins in pluginDir"
+    names = []
+    for path in glob.glob(os.path.join(pluginDir, "*.py")):
+        name = os.path.basename(path)[:-3]
+        if name not in programFiles:
+            names.append(name)
+    return sorted(names)
+
+
+def sample_segments(buffer, address=0, start=0, end=None):
+    """Return the parts of the input scored by --cpu auto.
+
+    Takes the first autoSample bytes of the window start to end of
+    buffer, whose first byte is at address, leaving out runs of a fill
+    byte (see autoFill). Returns a list of (address, bytes) tuples.
+    """
+    if end is None:
+        end = len(buffer)
+    segments = []
+    total = 0
+    pos = start
+    for match in fillRun.finditer(buffer, start, end):
+        if match.start() > pos:
+            segments.append((address + pos - start, bytes(buffer[pos:min(match.start(), pos + autoSample - total)])))
+            total += len(segments[-1][1])
+        pos = match.end()
+        if total >= autoSample:
+            return segments
+    if pos < end:
+        segments.append((address + pos - start, bytes(buffer[pos:min(end, pos + autoSample - total)])))
+    return segments
+
+
+def score_sample(cpu, segments):
+    """Score how much a sample of the input looks like code for a CPU.
+
+    Decodes each of segments, a list of (address, bytes) tuples as
+    given by sample_segments, from its start and returns a list of:
+      the fraction of bytes in valid, documented instructions
+      the fraction of instructions that are valid and documented
+      how much more often than by chance PC relative branches and jumps
+        to within the same segment go to the start of an instruction,
+        from 0 for no more often to 1 for always, or None if there are
+        none
+    """
+    disassembler = get_disassembler(cpu)
+    targets = []
+    good = 0
+    instructions = 0
+    covered = 0
+    decoded = 0
+
+    for address, sample in segments:
+        counts, advances, flags = disassembler.scan(sample)
+        starts = bytearray(len(sample))
+        branches = []
+        pos = 0
+
+        while pos < len(sample):
+            count = counts[pos]
+            if not count:  # Unexpected EOF
+                break
+            starts[pos] = 1
+            instructions += 1
+            if not flags[pos] & (inv | und):
+                good += 1
+                covered += count
+                if flags[pos] & pcr:
+                    branches.append(pos + count + disassembler.relative_offset(sample, pos, count, flags[pos]))
+                elif flags[pos] & jump:
+                    insn = next(disassembler.iter_instructions(sample, address + pos, pos, pos + count))
+                    branches.append((disassembler.operand_value(insn) - address) & 0xffff)
+            pos += count
+
+        decoded += pos
+        targets += [starts[target] for target in branches if 0 <= target < len(sample)]
+
+    # A random target is the start of an instruction as often as a
+    # random byte is.
+    size = sum(len(sample) for address, sample in segments)
+    chance = instructions / max(decoded, 1)
+    hits = None
+    if targets and chance < 1:
+        hits = max(sum(targets) / len(targets) - chance, 0) / (1 - chance)
+    return [covered / max(size, 1), good / max(instructions, 1), hits]
+
+
+def score_vectors(cpu, buffer, address):
+    """Score how plausible the vectors in an image are for a CPU.
+
+    Returns the fraction of the vectors of the CPU (see vectorTable)
+    that point into the image, or None if the CPU has none, runs the
+    code at the vectors, or the image does not hold them or is larger
+    than the address space. The image starts at address, or if it does
+    not reach the vectors from there, is assumed to end at $FFFF.
+    """
+    disassembler = get_disassembler(cpu)
+    if not disassembler.vectorTable or disassembler.vectorFormat == "code" or len(buffer) > 0x10000:
+        return None
+    if address + len(buffer) <= max(vector for vector, name in disassembler.vectorTable) + 1:
+        address = 0x10000 - len(buffer)
+    plausible = [0 <= target - address < len(buffer) for name, target in disassembler.vectors(buffer, address)]
+    return sum(plausible) / len(plausible) if plausible else None
+
+
+def documented_opcodes(cpu):
+    "Return the number of documented opcodes of a CPU"
+    table = get_disassembler(cpu).opcodeTable
+    return sum(1 for entry in table.values() if not (len(entry) > 3 and entry[3] & und))
+
+
+def score_cpu(cpu, segments, image, address):
+    """Score the input for a CPU, in a worker process of rank_cpus.
+
+    Returns the scores from score_sample and score_vectors, for the
+    segments of the sample and the whole image, which starts at
+    address, and the number of documented opcodes of the CPU. image is
+    None if it is too large to hold vectors.
+    """
+    scores = score_sample(cpu, segments)
+    scores.append(None if image is None else score_vectors(cpu, image, address))
+    return scores, documented_opcodes(cpu)
+
+
+def rank_cpus(buffer, address=0, start=0, end=None, jobs=None):
+    """Rank all the CPUs by how much the input looks like code for them.
+
+    Scores the sample of the window start to end of buffer, whose first
+    byte is at address, given by sample_segments. Each score is the
+    mean of the scores from score_sample and score_vectors. The
+    confidence is the share of exp(autoSharpness * score) among all
+    CPUs, scaled by how far the best score is above autoFloor, so that
+    it is low when no CPU fits well. Ties go to the CPU with fewer
+    documented opcodes, as code for a CPU is also valid code for its
+    extended versions. The plugins are scored in parallel by jobs
+    processes (defaults to the number of CPUs).
+
+    Returns a list of (cpu, score, confidence, scores) tuples, best first.
+    """
+    import concurrent.futures
+    names = plugin_names()
+    segments = sample_segments(buffer, address + start, start, end)
+    image = bytes(buffer) if len(buffer) <= 0x10000 else None
+    jobs = min(jobs or os.cpu_count() or 1, len(names))
+    arguments = ([segments] * len(names), [image] * len(names), [address] * len(names))
+
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(score_cpu, names, *arguments))
+    else:
+        results = list(map(score_cpu, names, *arguments))
+
+    ranking = []
+    for name, (score, documented) in zip(names, results):
+        known = [value for value in score if value is not None]
+        ranking.append((name, sum(known) / len(known), score, documented))
+    ranking.sort(key=lambda entry: (-entry[1], entry[3]))
+
+    weights = [math.exp(autoSharpness * total) for name, total, score, documented in ranking]
+    strength = min(max((ranking[0][1] - autoFloor) / (1 - autoFloor), 0), 1)
+    return [(name, total, strength * weight / sum(weights), score) for (name, total, score, documented), weight in zip(ranking, weights)]
+
+
+def ranking_lines(ranking):
+    "Generate the lines of a table of the ranking given by rank_cpus"
+    yield "cpu      score  confidence  bytes  instructions  branches  vectors"
+    for name, total, confidence, score in ranking:
+        fields = ["{0:5.2f}".format(value) if value is not None else "    -" for value in score]
+        yield "{0:8s} {1:5.2f}  {2:9.1f}%  {3[0]:s}  {3[1]:>12s}  {3[2]:>8s}  {3[3]:>7s}".format(name, total, 100 * confidence, fields)
+
+
+def parse_batch_line(line, cpu, address):
+    """Parse a line listing an input file for batch mode.
+
+    The line gives a file name, optionally followed by -c/--cpu and
+    -a/--address options for that file. Returns a (filename, cpu,
+    address) tuple, or None for a blank or comment line.
+    """
+    words = shlex.split(line, comments=True)
+    if not words:
+        return None
+    filename = words[0]
+    i = 1
+    while i < len(words):
+        if words[i] in ("-c", "--cpu") and i + 1 < len(words):
+            cpu = words[i + 1]
+        elif words[i] in ("-a", "--address") and i + 1 < len(words):
+            address = auto_int(words[i + 1])
+        else:
+            raise ValueError("unexpected '{}' in entry for '{}'".format(words[i], filename))
+        i += 2
+    return (filename, cpu, address)
+
+
+def batch_inputs(args):
+    """Return the (filename, cpu, address) inputs for batch mode.
+
+    Inputs come from file names or glob patterns on the command line,
+    lines of a manifest file, and lines read from standard input if a
+    file name of - is given.
+    """
+    inputs = []
+    for pattern in args.filename:
+        if pattern == "-":
+            for line in sys.stdin:
+                entry = parse_batch_line(line, args.cpu, args.address)
+                if entry is not None:
+                    inputs.append(entry)
+        else:
+            # Keep a pattern that matches nothing so it gets reported.
+            for filename in sorted(glob.glob(pattern)) or [pattern]:
+                inputs.append((filename, args.cpu, args.address))
+    if args.manifest:
+        with open(args.manifest) as f:
+            for line in f:
+                entry = parse_batch_line(line, args.cpu, args.address)
+                if entry is not None:
+                    inputs.append(entry)
+    return inputs
+
+
+def output_path(filename, outdir=None, format="text"):
+    "Return the name of the file to write the disassembly of filename to"
+    if outdir:
+        filename = os.path.join(outdir, os.path.basename(filename))
+    return filename + (".asm" if format == "text" else "." + format)
+
+
+def disassemble_file(filename, cpu, address, output, undocumented=False, invalid_as_bytes=True, nolist=False, render_cache=4096, format="text", cache=True):
+    """Disassemble one input file to an output file.
+
+    The output is taken from the ResultCache if the file has been
+    disassembled with the same options before, unless cache is false.
+    Returns a tuple of the number of bytes and instructions, and an
+    error message which is None if there was no error.
+    """
+    results = None
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+        if cpu == "auto":
+            cpu = rank_cpus(data, address, jobs=1)[0][0]
+        if cache:
+            results = ResultCache()
+            key = results.key(data, cpu, (address & 0xffff, undocumented, invalid_as_bytes, nolist, format, False, None))
+        with open(output, "w", buffering=outputBuffer, newline="") as out:
+            count = None if results is None else results.get(key, out)
+            if count is None:
+                if results is not None:
+                    out = results.record(key, out)
+                disassembler = get_disassembler(cpu, undocumented, invalid_as_bytes, nolist, render_cache)
+                if format == "text":
+                    count = write_listing(disassembler, data, out, address)
+                else:
+                    count = write_records(disassembler, disassembler.iter_instructions(data, address), out, format)
+                if results is not None:
+                    results.save(count)
+    except FileNotFoundError as e:
+        if e.filename == plugin_path(cpu):
+            return (0, 0, "CPU plugin file '{}' not found.".format(e.filename))
+        else:
+            return (0, 0, "input file '{}' not found.".format(e.filename))
+    except (OSError, ValueError) as e:
+        return (0, 0, "{}: {}".format(filename, e))
+    finally:
+        if results is not None:
+            results.discard()
+    return (len(data), count, None)
+
+
+def init_worker(cpus, undocumented, invalid_as_bytes, nolist, render_cache):
+    "Load the tables for CPUs in a batch mode worker process"
+    for cpu in cpus:
+        try:
+            get_disassembler(cpu, undocumented, invalid_as_bytes, nolist, render_cache)
+        except (OSError, ValueError):
+            pass  # Reported when a file for the CPU is disassembled
+
+
+def file_size(filename):
+    "Return the size of a file, or 0 if it can't be read"
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+def batch(args):
+    "Disassemble all the input files for batch mode. Returns the exit status"
+    import concurrent.futures
+    start = time.perf_counter()
+    status = 0
+    files = 0
+    size = 0
+    instructions = 0
+
+    try:
+        inputs = batch_inputs(args)
+    except (OSError, ValueError) as e:
+        print("error: " + str(e), file=sys.stderr)
+        return 1
+
+    if args.outdir:
+        os.makedirs(args.outdir, exist_ok=True)
+
+    options = (args.undocumented, not args.invalid, args.nolist, args.render_cache)
+    jobs = [(filename, cpu, address, output_path(filename, args.outdir, args.format)) + options + (args.format, not args.no_result_cache) for filename, cpu, address in inputs]
+
+    if args.jobs > 1 and len(jobs) > 1:
+        # Start the largest files first so that one big file started
+        # late doesn't leave the other workers idle at the end.
+        order = sorted(range(len(jobs)), key=lambda i: file_size(jobs[i][0]), reverse=True)
+        with concurrent.futures.ProcessPoolExecutor(args.jobs, initializer=init_worker, initargs=(sorted(set(job[1] for job in jobs)),) + options) as pool:
+            futures = {i: pool.submit(disassemble_file, *jobs[i]) for i in order}
+            results = [futures[i].result() for i in range(len(jobs))]
+    else:
+        results = [disassemble_file(*job) for job in jobs]
+
+    # Report in the order the files were given.
+    for result in results:
+        if result[2] is not None:
+            print("error: " + result[2], file=sys.stderr)
+            status = 1
+        else:
+            files += 1
+            size += result[0]
+            instructions += result[1]
+
+    elapsed = time.perf_counter() - start
+    print("{0:d} files, {1:d} bytes, {2:d} instructions in {3:.2f} seconds".format(files, size, instructions, elapsed), file=sys.stderr)
+    return status
+
+
+def input_window(args, size):
+    """Return the start and end of the part of the input to disassemble.
+
+    The part is given either as a file offset and length, or as CPU
+    addresses, where the file starts at args.address. The length is
+    counted from whichever start is given.
+    """
+    start = args.offset
+    if args.start is not None:
+        start = args.start - args.address
+    end = size if args.length is None else start + args.length
+    if args.end is not None:
+        end = args.end - args.address
+    end = min(end, size)
+    if start < 0 or start > size:
+        raise ValueError("start of disassembly is outside the input file")
+    if end < start:
+        raise ValueError("end of disassembly is before start")
+    return start, end
+
+
+def main():
+    # Avoids an error when output piped, e.g. to "less"
+    signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+
+    # Look up addresses in a cross reference database.
+    if sys.argv[1:2] == ["xref"]:
+        sys.exit(xref(sys.argv[2:]))
+
+    # Parse command line options
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename", help="Binary file to disassemble, or - for standard input (files or patterns with --batch)", nargs="*")
+    parser.add_argument("-c", "--cpu", help="Specify CPU type, or auto to detect it (defaults to 6502)", default="6502")
+    parser.add_argument("-n", "--nolist", help="Don't list  instruction bytes (make output suitable for assembler)", action="store_true")
+    parser.add_argument("-a", "--address", help="Specify starting address (defaults to 0)", default=0, type=auto_int)
+    parser.add_argument("-u", "--undocumented", help="Allow undocumented opcodes", action="store_true")
+    parser.add_argument("-i", "--invalid", help="Show invalid opcodes as ??? rather than constants", action="store_true")
+    parser.add_argument("-o", "--output", help="File to write the disassembly to (defaults to standard output)")
+    parser.add_argument("-f", "--format", help="Output format, a listing or a record for each instruction (defaults to text)", choices=outputFormats, default="text")
+    parser.add_argument("-b", "--batch", help="Disassemble many files, writing each to a file with .asm added to its name", action="store_true")
+    parser.add_argument("-m", "--manifest", help="File listing input files for batch mode, one per line with optional --cpu and --address")
+    parser.add_argument("-O", "--outdir", help="Directory for output files in batch mode (defaults to same as input)")
+    parser.add_argument("-j", "--jobs", help="Number of processes to use (defaults to 1)", default=1, type=int)
+    parser.add_argument("-x", "--index", help="File to save instruction boundaries in, for reuse by later runs")
+    parser.add_argument("--offset", help="Offset in file to start disassembling at (defaults to 0)", default=0, type=auto_int)
+    parser.add_argument("--length", help="Number of bytes to disassemble (defaults to rest of file)", type=auto_int)
+    parser.add_argument("--start", help="Address to start disassembling at, instead of --offset", type=auto_int)
+    parser.add_argument("--end", help="Address to stop disassembling at (not included), instead of --length", type=auto_int)
+    parser.add_argument("--render-cache", help="Number of rendered instructions to cache, 0 for none (defaults to 4096)", default=4096, type=int)
+    parser.add_argument("--cache-stats", help="Show the hit rate of the render cache", action="store_true")
+    parser.add_argument("--stats", help="Show counts of the instructions and the time taken by each phase (uses one process)", action="store_const", const="text")
+    parser.add_argument("--stats-json", help="Like --stats, but as a JSON object", action="store_const", const="json", dest="stats")
+    parser.add_argument("--trace", help="Only disassemble code reached by following jumps and branches from the entry points, showing other bytes as data", action="store_true")
+    parser.add_argument("--entry", help="Address to trace code from as well as the reset and interrupt vectors, may be given more than once (implies --trace)", action="append", type=auto_int)
+    parser.add_argument("--no-vectors", help="Don't trace code from the reset and interrupt vectors of the CPU", action="store_true")
+    parser.add_argument("--labels", help="Replace the addresses branched or jumped to with labels, and define them (uses one process)", action="store_true")
+    parser.add_argument("--xref", help="SQLite database to write the references made by each instruction to, for 'udis.py xref DATABASE ADDRESS' to look up", metavar="DATABASE")
+    parser.add_argument("--no-result-cache", help="Don't reuse or keep the output of earlier runs with the same input and options", action="store_true")
+    parser.add_argument("--clear-result-cache", help="Remove the kept output of earlier runs", action="store_true")
+    args = parser.parse_args()
+
+    # Clearing the result cache is all there is to do without an input.
+    if args.clear_result_cache:
+        removed = ResultCache().clear()
+        print("removed {0:d} cached results".format(removed), file=sys.stderr)
+        if not args.filename and not args.manifest:
+            sys.exit(0)
+
+    if args.batch or args.manifest:
+        if args.offset or args.length is not None or args.start is not None or args.end is not None or args.output or args.stats or args.trace or args.entry or args.labels or args.xref:
+            parser.error("--output, --offset, --length, --start, --end, --stats, --trace, --labels and --xref can't be used with --batch")
+        sys.exit(batch(args))
+    if len(args.filename) != 1:
+        parser.error("expected one filename (use --batch for more)")
+    if args.index and args.format != "text":
+        parser.error("--index can only be used with --format text")
+    if args.index and args.stats:
+        parser.error("--index can't be used with --stats or --stats-json")
+    if args.labels and args.format != "text":
+        parser.error("--labels can only be used with --format text")
+    if args.index and args.labels:
+        parser.error("--index can't be used with --labels")
+    trace = args.trace or args.entry is not None
+    if args.index and trace:
+        parser.error("--index can't be used with --trace")
+
+    # Get filename from command line arguments.
+    filename = args.filename[0]
+
+    # Standard input is disassembled as it is read if filename is -.
+    if filename == "-":
+        if args.offset or args.length is not None or args.start is not None or args.end is not None or args.index:
+            parser.error("--offset, --length, --start, --end and --index can't be used with standard input")
+        if args.cpu == "auto":
+            parser.error("--cpu auto can't be used with standard input")
+        if trace:
+            parser.error("--trace can't be used with standard input")
+        if args.labels:
+            parser.error("--labels can't be used with standard input")
+        if args.xref:
+            parser.error("--xref can't be used with standard input")
+    else:
+        # Map the input file into memory.
+        # Display error and exit if filename does not exist.
+        try:
+            buffer = map_file(filename)
+        except FileNotFoundError:
+            print(("error: input file '{}' not found.".format(filename)), file=sys.stderr)
+            sys.exit(1)
+
+        # Work out which part of the file to disassemble.
+        try:
+            start, end = input_window(args, len(buffer))
+        except ValueError as e:
+            print("error: " + str(e), file=sys.stderr)
+            sys.exit(1)
+        origin = args.address + start
+
+        # Pick the CPU the input looks most like, and show the others.
+        if args.cpu == "auto":
+            ranking = rank_cpus(buffer, args.address, start, end, args.jobs if args.jobs > 1 else None)
+            for line in ranking_lines(ranking):
+                print(line, file=sys.stderr)
+            args.cpu = ranking[0][0]
+
+    # Load CPU plugin based on command line option.
+    # Looks for plugin in same directory as this program.
+    loading = time.perf_counter()
+    try:
+        disassembler = Disassembler(args.cpu, args.address, args.undocumented, not args.invalid, args.nolist, render_cache=args.render_cache)
+    except FileNotFoundError:
+        print(("error: CPU plugin file '{}' not found.".format(plugin_path(args.cpu))), file=sys.stderr)
+        print("The following CPUs are supported: " + cpus)
+        sys.exit(1)
+    except ValueError as e:
+        print("error: " + str(e), file=sys.stderr)
+        sys.exit(1)
+
+    # Code is traced from the entry points given and those found from
+    # the vectors of the CPU, or the start of the input if there are none.
+    if trace:
+        entries = args.entry or []
+        for entry in entries:
+            if not 0 <= (entry - origin) & 0xffff < end - start:
+                print("warning: entry point ${0:04X} is outside the input".format(entry & 0xffff), file=sys.stderr)
+        if not args.no_vectors:
+            for name, entry in disassembler.vectors(buffer, args.address):
+                if 0 <= (entry - origin) & 0xffff < end - start and entry not in entries:
+                    entries.append(entry)
+        entries = entries or [origin]
+
+    # Time and count everything from here on if asked to.
+    stats = None
+    if args.stats:
+        stats = Statistics()
+        stats.times["load"] = time.perf_counter() - loading
+        stats.attach(disassembler)
+
+    # Open the output file, if there is one.
+    out = sys.stdout
+    if args.output:
+        try:
+            out = open(args.output, "w", buffering=outputBuffer, newline="")
+        except OSError as e:
+            print("error: " + str(e), file=sys.stderr)
+            sys.exit(1)
+    writer = out if stats is None else stats.output(out)
+    stdin = sys.stdin.buffer if stats is None else stats.input(sys.stdin.buffer)
+
+    # The output of a file is kept to be reused by a later run with the
+    # same input and options, unless it is being timed or an index file
+    # is to be written by disassembling it.
+    results = None
+    if filename != "-" and stats is None and not args.index and not args.no_result_cache:
+        results = ResultCache()
+        key = results.key(buffer, args.cpu, (origin & 0xffff, args.undocumented, not args.invalid, args.nolist, args.format, args.labels, entries if trace else None), start, end)
+
+    started = time.perf_counter()
+    try:
+        if results is not None and results.get(key, writer) is not None:
+            results = None
+        else:
+            if results is not None:
+                writer = results.record(key, writer)
+            if filename == "-" and args.format != "text":
+                count = write_records(disassembler, disassembler.iter_stream(read_blocks(stdin)), writer, args.format)
+            elif filename == "-":
+                count = stream_listing(disassembler, stdin, writer)
+            elif trace and args.format != "text":
+                items = disassembler.iter_trace(buffer, entries, origin, start, end)
+                count = write_records(disassembler, (item for item in items if item.__class__ is Instruction), writer, args.format)
+            elif args.labels:
+                count = write_labelled(disassembler, buffer, writer, origin, start, end, entries if trace else None)
+            elif trace:
+                count = write_trace(disassembler, buffer, writer, entries, origin, start, end)
+            elif args.format != "text":
+                count = write_records(disassembler, disassembler.iter_instructions(buffer, origin, start, end), writer, args.format)
+            # Share a large file among several processes if asked to.
+            elif args.index or (stats is None and args.jobs > 1 and end - start >= parallelMinimum):
+                count = parallel_listing(filename, args.cpu, origin, writer, args.jobs, args.undocumented, not args.invalid, args.nolist, index=args.index, start=start, end=end, render_cache=args.render_cache)
+            else:
+                count = write_listing(disassembler, buffer, writer, origin, start, end)
+            if results is not None:
+                results.save(count)
+        writer.flush()
+    except KeyboardInterrupt:
+        print("Interrupted by Control-C", file=sys.stderr)
+    except OSError as e:  # Such as an index file that can't be written
+        print("error: " + str(e), file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if results is not None:
+            results.discard()
+        if out is not sys.stdout:
+            out.close()
+
+    # Write the references made by the same instructions to a database.
+    if args.xref:
+        import sqlite3
+        if trace:
+            items = disassembler.iter_trace(buffer, entries, origin, start, end)
+        else:
+            items = disassembler.iter_instructions(buffer, origin, start, end)
+        try:
+            write_xref(disassembler, items, args.xref, start)
+        except (OSError, sqlite3.Error) as e:
+            print("error: " + str(e), file=sys.stderr)
+            sys.exit(1)
+
+    if stats is not None:
+        stats.finish(time.perf_counter() - started)
+        if args.stats == "json":
+            import json
+            print(json.dumps(stats.summary()), file=sys.stderr)
+        else:
+            for line in stats.report():
+                print(line, file=sys.stderr)
+
+    # Lines are rendered by worker processes when decoding in parallel,
+    # so there is nothing to report from this one.
+    if args.cache_stats and sum(disassembler.cacheCounts) > 0:
+        print(disassembler.cache_stats(), file=sys.stderr)
@@ -1006,5 +1006,103 @@ def extra_opcodes(addr_table, op_table):
 extra_opcodes(addressModeTable, opcodeTable)
 del extra_opcodes
 
+# Jump table
+# Instructions that jump to or call the address given by their operand,
+# as mnemonic and addressing mode.
+jumpTable = [
+[ "jp",   "nn" ],
+[ "jp",   "nz,nn" ],
+[ "jp",   "z,nn" ],
+[ "jp",   "nc,nn" ],
+[ "jp",   "c,nn" ],
+[ "jp",   "po,nn" ],
+[ "jp",   "pe,nn" ],
+[ "jp",   "p,nn" ],
+[ "jp",   "m,nn" ],
+[ "call", "nn" ],
+[ "call", "nz,nn" ],
+[ "call", "z,nn" ],
+[ "call", "nc,nn" ],
+[ "call", "c,nn" ],
+[ "call", "po,nn" ],
+[ "call", "pe,nn" ],
+[ "call", "p,nn" ],
+[ "call", "m,nn" ],
+]
+
+# Stop table
+# Instructions after which execution does not go on to the next
+# instruction, as mnemonic and addressing mode.
+stopTable = [
+[ "jp",   "nn" ],
+[ "jp",   "indhl" ],
+[ "jr",   "pcr" ],
+[ "ret",  "implied" ],
+[ "reti", "implied" ],
+[ "retn", "implied" ],
+]
+
+# Vector table
+# Reset and interrupt entry points, as address and name. The code to
+# run starts at the address itself.
+vectorTable = [
+[ 0x0000, "reset" ],
+[ 0x0008, "rst1"  ],
+[ 0x0010, "rst2"  ],
+[ 0x0018, "rst3"  ],
+[ 0x0020, "rst4"  ],
+[ 0x0028, "rst5"  ],
+[ 0x0030, "rst6"  ],
+[ 0x0038, "rst7"  ],
+[ 0x0066, "nmi"   ],
+]
+vectorFormat = "code"
+
+# Reference table
+# Kinds of reference made by operands, by addressing mode: "immediate"
+# for a constant, "read" for the address of data that is loaded, or
+# "write" where the mode stores to the address, as in "indnn,a". The
+# mode says which way the data goes, so the writeTable is empty.
+# Operands of other modes are left out of cross references.
+referenceTable = {
+"n"        : "immediate",
+"a,n"      : "immediate",
+"b,n"      : "immediate",
+"c,n"      : "immediate",
+"d,n"      : "immediate",
+"e,n"      : "immediate",
+"h,n"      : "immediate",
+"l,n"      : "immediate",
+"indhl,n"  : "immediate",
+"bc,nn"    : "immediate",
+"de,nn"    : "immediate",
+"hl,nn"    : "immediate",
+"sp,nn"    : "immediate",
+"ix,aa"    : "immediate",
+"iy,aa"    : "immediate",
+"a,indnn"  : "read",
+"hl,indnn" : "read",
+"bc,indaa" : "read",
+"de,indaa" : "read",
+"sp,indaa" : "read",
+"ix,indaa" : "read",
+"iy,indaa" : "read",
+"indnn,a"  : "write",
+"indnn,hl" : "write",
+"indaa,bc" : "write",
+"indaa,de" : "write",
+"indaa,sp" : "write",
+"indaa,ix" : "write",
+"indaa,iy" : "write",
+}
+
+# Write table
+# Instructions that write to the address given by their operand.
+writeTable = []
+
+# Call table
+# Instructions that call a subroutine rather than jump to it.
+callTable = [ "call" ]
+
 # End of processor specific code
 ##########################################################################